@@ -15,11 +15,22 @@
 
 # Python 3 Compatibility imports
 
+import codecs
+import fcntl
 import hashlib
 import json
+import os
+import queue
+import random
 import secrets
+import sqlite3
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 # Phantom App imports
 import phantom.app as phantom
@@ -27,6 +38,8 @@ import requests
 from bs4 import BeautifulSoup
 from phantom.action_result import ActionResult
 from phantom.base_connector import BaseConnector
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
 # Usage of the consts file is recommended
 from paloaltocortexxdr_consts import *
@@ -37,6 +50,359 @@ class RetVal(tuple):
         return tuple.__new__(RetVal, (val1, val2))
 
 
+class ReplyStream:
+    """Incremental parser of a {"reply": ...} API response body.
+
+    Only the item being decoded is held in memory: the reply fields preceding the streamed array are
+    parsed when the stream is created, iterating yields the array items one at a time and the reply
+    fields following the array are added to 'reply' once the items are exhausted.
+    """
+
+    def __init__(self, chunks, item_key=None, response=None):
+        """
+        :param chunks: iterable of the raw body chunks
+        :param item_key: key of the array to stream inside the reply object, None when the reply itself is the array
+        :param response: response to close with the stream
+        """
+        self.reply = {}
+        self._chunks = iter(chunks)
+        self._item_key = item_key
+        self._response = response
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._items = self._parse()
+        # Parse up to the first item of the array
+        next(self._items, None)
+
+    def __iter__(self):
+        return self._items
+
+    def close(self):
+        self._items.close()
+        if self._response is not None:
+            self._response.close()
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer = self._buffer[self._pos :] + self._utf8.decode(b"", final=True)
+            self._pos = 0
+            self._eof = True
+            return True
+        self._buffer = self._buffer[self._pos :] + self._utf8.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of the JSON response")
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Unexpected character {char!r} in the JSON response")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending with the buffer may be a number continuing in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except ValueError:
+                if self._eof:
+                    raise
+            # Grow the buffer geometrically so a large value is not decoded once per chunk
+            pending = len(self._buffer) - self._pos
+            while len(self._buffer) - self._pos < 2 * pending and self._fill():
+                pass
+
+    def _keys(self):
+        # Yields the keys of the object whose opening brace was consumed, the caller consumes every value
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def _array(self):
+        self._expect("[")
+        yield None
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def _parse(self):
+        self._expect("{")
+        for key in self._keys():
+            if key != "reply":
+                self._value()
+            elif self._item_key is None and self._peek() == "[":
+                yield from self._array()
+            elif self._item_key is not None and self._peek() == "{":
+                self._expect("{")
+                for reply_key in self._keys():
+                    if reply_key == self._item_key and self._peek() == "[":
+                        yield from self._array()
+                    else:
+                        self.reply[reply_key] = self._value()
+            else:
+                self.reply = self._value()
+
+
+class StateStore:
+    """SQLite store of the connector state that grows with the ingested data.
+
+    The poll cursors, the ingested ID and incident indexes, the endpoint inventory and the response
+    caches live in typed, indexed tables of a database in the app state directory. The WAL journal
+    lets concurrent action processes read while another one writes, and every write is a small
+    transaction instead of a rewrite of the whole JSON state.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS ingested_ids (key TEXT PRIMARY KEY, timestamp INTEGER, ingested_at INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ingested_ids_timestamp ON ingested_ids (timestamp)",
+        "CREATE TABLE IF NOT EXISTS incident_index (incident_id TEXT PRIMARY KEY, container_id INTEGER, modification_time INTEGER)",
+        "CREATE INDEX IF NOT EXISTS incident_index_modification_time ON incident_index (modification_time)",
+        "CREATE TABLE IF NOT EXISTS endpoints (endpoint_id TEXT PRIMARY KEY, record TEXT NOT NULL, last_seen INTEGER)",
+        "CREATE TABLE IF NOT EXISTS endpoint_keys (key TEXT NOT NULL, endpoint_id TEXT NOT NULL, PRIMARY KEY (key, endpoint_id))",
+        "CREATE INDEX IF NOT EXISTS endpoint_keys_endpoint_id ON endpoint_keys (endpoint_id)",
+        "CREATE TABLE IF NOT EXISTS endpoint_hashes (endpoint_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS response_cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+        "PRIMARY KEY (namespace, key))",
+        "CREATE INDEX IF NOT EXISTS response_cache_expires_at ON response_cache (expires_at)",
+    )
+
+    def __init__(self, path):
+        """
+        :param path: path of the database file
+        """
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        self._db = sqlite3.connect(path, timeout=STATE_STORE_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction():
+            for statement in self.SCHEMA:
+                self._db.execute(statement)
+
+    @contextmanager
+    def transaction(self):
+        """Groups the writes of the block into a single transaction, nested blocks join the outer one."""
+        with self._lock:
+            if self._in_transaction:
+                yield
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            else:
+                self._db.execute("COMMIT")
+            finally:
+                self._in_transaction = False
+
+    def _query(self, statement, parameters=()):
+        with self._lock:
+            return self._db.execute(statement, parameters).fetchall()
+
+    def _write(self, statement, rows):
+        with self.transaction():
+            self._db.executemany(statement, rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get_cursor(self, name, default=None):
+        rows = self._query("SELECT value FROM cursors WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def set_cursor(self, name, value):
+        self._write("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)", [(name, json.dumps(value), int(time.time()))])
+
+    def delete_cursor(self, name):
+        self._write("DELETE FROM cursors WHERE name = ?", [(name,)])
+
+    def get_ingested(self, keys):
+        """Returns the subset of the given ingested IDs that are recorded."""
+        found = set()
+        keys = list(keys)
+        for index in range(0, len(keys), STATE_STORE_BATCH_SIZE):
+            batch = keys[index : index + STATE_STORE_BATCH_SIZE]
+            statement = "SELECT key FROM ingested_ids WHERE key IN ({})".format(", ".join("?" * len(batch)))
+            found.update(row[0] for row in self._query(statement, batch))
+        return found
+
+    def add_ingested(self, entries):
+        now = int(time.time())
+        self._write("INSERT OR REPLACE INTO ingested_ids VALUES (?, ?, ?)", [(key, timestamp, now) for key, timestamp in entries.items()])
+
+    def get_incident_index(self, incident_ids):
+        """Returns the [container ID, modification time] index entries of the given incidents that are indexed."""
+        entries = {}
+        incident_ids = list(incident_ids)
+        for index in range(0, len(incident_ids), STATE_STORE_BATCH_SIZE):
+            batch = incident_ids[index : index + STATE_STORE_BATCH_SIZE]
+            statement = "SELECT incident_id, container_id, modification_time FROM incident_index WHERE incident_id IN ({})".format(
+                ", ".join("?" * len(batch))
+            )
+            entries.update((row[0], [row[1], row[2]]) for row in self._query(statement, batch))
+        return entries
+
+    def update_incident_index(self, entries):
+        self._write("INSERT OR REPLACE INTO incident_index VALUES (?, ?, ?)", [(key, value[0], value[1]) for key, value in entries.items()])
+
+    def get_endpoint_ids(self):
+        return {row[0] for row in self._query("SELECT endpoint_id FROM endpoints")}
+
+    def update_endpoints(self, entries):
+        """Upserts (endpoint ID, record, last seen, lookup keys) inventory entries, replacing their lookup keys."""
+        with self.transaction():
+            self._db.executemany(
+                "INSERT OR REPLACE INTO endpoints VALUES (?, ?, ?)",
+                [(endpoint_id, json.dumps(record), last_seen) for endpoint_id, record, last_seen, _ in entries],
+            )
+            self._db.executemany("DELETE FROM endpoint_keys WHERE endpoint_id = ?", [(entry[0],) for entry in entries])
+            self._db.executemany("INSERT OR IGNORE INTO endpoint_keys VALUES (?, ?)", [(key, entry[0]) for entry in entries for key in entry[3]])
+
+    def remove_endpoints(self, endpoint_ids):
+        rows = [(endpoint_id,) for endpoint_id in endpoint_ids]
+        with self.transaction():
+            self._db.executemany("DELETE FROM endpoints WHERE endpoint_id = ?", rows)
+            self._db.executemany("DELETE FROM endpoint_keys WHERE endpoint_id = ?", rows)
+
+    def find_endpoints(self, key):
+        """Returns the inventory records of the endpoints having the lookup key, the most recently seen first."""
+        rows = self._query(
+            "SELECT endpoints.record FROM endpoint_keys JOIN endpoints ON endpoints.endpoint_id = endpoint_keys.endpoint_id "
+            "WHERE endpoint_keys.key = ? ORDER BY endpoints.last_seen DESC",
+            (key,),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def get_endpoint_hashes(self):
+        return dict(self._query("SELECT endpoint_id, content_hash FROM endpoint_hashes"))
+
+    def update_endpoint_hashes(self, hashes, removed):
+        with self.transaction():
+            self._db.executemany("INSERT OR REPLACE INTO endpoint_hashes VALUES (?, ?)", list(hashes.items()))
+            self._db.executemany("DELETE FROM endpoint_hashes WHERE endpoint_id = ?", [(endpoint_id,) for endpoint_id in removed])
+
+    def cache_get(self, namespace, keys):
+        """Returns the unexpired cached values of the given keys."""
+        values = {}
+        keys = list(keys)
+        now = time.time()
+        for index in range(0, len(keys), STATE_STORE_BATCH_SIZE):
+            batch = keys[index : index + STATE_STORE_BATCH_SIZE]
+            statement = (
+                "SELECT key, value FROM response_cache WHERE namespace = ? AND key IN ({}) AND (expires_at IS NULL OR expires_at > ?)".format(
+                    ", ".join("?" * len(batch))
+                )
+            )
+            values.update((row[0], json.loads(row[1])) for row in self._query(statement, [namespace, *batch, now]))
+        return values
+
+    def cache_set(self, namespace, values, ttl=None):
+        """Caches the given values for ttl seconds, forever when ttl is None."""
+        expires_at = None if ttl is None else time.time() + ttl
+        self._write(
+            "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+            [(namespace, key, json.dumps(value), expires_at) for key, value in values.items()],
+        )
+
+    def evict(self, interval=0):
+        """Drops the expired cache entries, the ingested IDs past their retention and the oldest incident index entries.
+
+        The cache entries without expiry are capped at MAX_PERMANENT_CACHE_ENTRIES per namespace, the
+        oldest written ones are dropped first. The eviction takes the write lock, it is skipped when the previous one ran less than interval seconds ago.
+        """
+        now = time.time()
+        if now - self.get_cursor("last_eviction", 0) < interval:
+            return
+
+        retention_start = int((now - INGESTED_IDS_RETENTION_DAYS * 86400) * 1000)
+        with self.transaction():
+            self._db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            # A replaced entry gets a new rowid, so the rowid order is the write order
+            for (namespace,) in self._db.execute("SELECT DISTINCT namespace FROM response_cache WHERE expires_at IS NULL").fetchall():
+                self._db.execute(
+                    "DELETE FROM response_cache WHERE namespace = ? AND expires_at IS NULL AND rowid <= "
+                    "(SELECT rowid FROM response_cache WHERE namespace = ? AND expires_at IS NULL ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                    (namespace, namespace, MAX_PERMANENT_CACHE_ENTRIES),
+                )
+            self._db.execute("DELETE FROM ingested_ids WHERE timestamp < ?", (retention_start,))
+            # The cut-off is found by walking the modification time index instead of sorting the whole table
+            self._db.execute(
+                "DELETE FROM incident_index WHERE modification_time < "
+                "(SELECT modification_time FROM incident_index ORDER BY modification_time DESC LIMIT 1 OFFSET ?)",
+                (MAX_INCIDENT_INDEX_SIZE - 1,),
+            )
+            self.set_cursor("last_eviction", now)
+
+
+def compile_projection(paths):
+    """Compiles dotted field paths into a function pruning a record to those fields.
+
+    A path addresses nested fields through objects and lists of objects alike, so that
+    'events.actor_process_image_sha256' keeps only that field of every event of an alert.
+    :param paths: list of dotted field paths
+    :return: function returning the projection of a record
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if part in node and node[part] is None:
+                # The whole field is already kept
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = None
+
+    def build(node):
+        fields = [(key, None if child is None else build(child)) for key, child in node.items()]
+
+        def project(value):
+            if isinstance(value, list):
+                return [project(item) for item in value]
+            if not isinstance(value, dict):
+                return value
+            return {key: value[key] if child is None else child(value[key]) for key, child in fields if key in value}
+
+        return project
+
+    return build(tree)
+
+
 class TestConnector(BaseConnector):
     def __init__(self):
         # Call the BaseConnectors init first
@@ -51,6 +417,13 @@ class TestConnector(BaseConnector):
         self._api_key = None
         self._advanced = None
         self._api_key_id = None
+        self._session = None
+        self._max_retries = None
+        self._rate_limit = None
+        self._log_verbosity = DEFAULT_LOG_VERBOSITY
+        self._log_max_bytes = DEFAULT_LOG_MAX_BYTES
+        self._legacy_summaries = False
+        self._store = None
 
     def _get_error_message_from_exception(self, e):
         """This method is used to get appropriate error messages from the exception.
@@ -147,13 +520,68 @@ class TestConnector(BaseConnector):
 
         return RetVal(action_result.set_status(phantom.APP_ERROR, message), None)
 
-    def _process_response(self, r, action_result):
-        # store the r_text in debug data, it will get dumped in the logs if the action fails
+    def _format_for_log(self, payload):
+        """This method serializes a payload for the logs, stopping once the byte cap is reached.
+
+        :param payload: JSON serializable payload or text
+        :return: payload text, truncated to the 'log_max_bytes' cap
+        """
+        cap = self._log_max_bytes
+        chunks = [payload] if isinstance(payload, str) else json.JSONEncoder(default=str).iterencode(payload)
+        parts = []
+        size = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if cap and size > cap:
+                return "{}... [truncated to {} characters]".format("".join(parts)[:cap], cap)
+        return "".join(parts)
+
+    def _log_payload(self, label, payload):
+        """This method writes a request or response payload to the progress messages as the log verbosity allows.
+
+        The payload is only serialized when it is logged.
+        :param label: label of the payload
+        :param payload: request or response payload
+        """
+        if self._log_verbosity == "minimal":
+            return
+        self.save_progress(f"{label}: {self._format_for_log(payload)}")
+
+    def _add_legacy_summary(self, summary, response, records=(), record_key=None):
+        """This method adds the raw response and a copy of every record to the summary for playbooks still reading them.
+
+        The summaries only hold counts and key fields unless the 'legacy_summaries' asset setting is enabled,
+        the records themselves are in the data of the action result.
+        :param summary: summary of the action result
+        :param response: response of the API call
+        :param records: records of the response
+        :param record_key: summary key format of a record, numbered from 1
+        """
+        if not self._legacy_summaries:
+            return
+        if record_key:
+            for index, record in enumerate(records, 1):
+                summary[record_key.format(index)] = record
+        summary["raw"] = response
+
+    def _add_response_debug_data(self, r, action_result):
+        # The debug data gets dumped in the logs if the action fails
         if hasattr(action_result, "add_debug_data"):
             action_result.add_debug_data({"r_status_code": r.status_code})
-            action_result.add_debug_data({"r_text": r.text})
+            action_result.add_debug_data({"r_text": self._format_for_log(r.text)})
             action_result.add_debug_data({"r_headers": r.headers})
 
+    def _process_response(self, r, action_result):
+        ret_val, response = self._parse_response(r, action_result)
+
+        # store the response in debug data only when it is needed to troubleshoot the call
+        if phantom.is_fail(ret_val) or self._log_verbosity == "verbose":
+            self._add_response_debug_data(r, action_result)
+
+        return RetVal(ret_val, response)
+
+    def _parse_response(self, r, action_result):
         # Process each 'Content-Type' of response separately
 
         # Process a json response
@@ -178,35 +606,247 @@ class TestConnector(BaseConnector):
 
         return RetVal(action_result.set_status(phantom.APP_ERROR, message), None)
 
-    def _make_rest_call(self, endpoint, action_result, method="post", **kwargs):
-        # **kwargs can be any additional parameters that requests.request accepts
-        resp_json = None
+    def _get_retry_delay(self, attempt, response=None):
+        """This method returns how long to wait before the next attempt of a failed request.
+
+        A Retry-After header of a throttled response is honored, otherwise the delay is a
+        jittered exponential backoff.
+        :param attempt: number of the attempt that failed, starting at 1
+        :param response: response of the failed attempt, None for a connection error
+        :return: delay in seconds
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except Exception:
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), MAX_RETRY_DELAY)
+
+        return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)))  # nosec B311
+
+    def _acquire_rate_limit_token(self):
+        """This method blocks until the shared token bucket of the API key grants a request.
+
+        The bucket lives in a file of the app state directory keyed by the FQDN and API key ID and
+        is updated under an exclusive file lock, so every concurrently running action of every asset
+        using the same key shares the requests-per-second and burst limits. Actions other than on_poll
+        leave RATE_LIMIT_POLL_RESERVE of the burst untouched so investigations cannot starve the poll,
+        the reserve is capped so that a single token always remains within their reach.
+        """
+        if not self._rate_limit:
+            return
 
+        rate, burst, path = self._rate_limit
+        reserve = 0 if self.get_action_identifier() == "on_poll" else min(burst * RATE_LIMIT_POLL_RESERVE, burst - 1)
+
+        while True:
+            with open(path, "a+") as bucket_file:
+                fcntl.flock(bucket_file, fcntl.LOCK_EX)
+                bucket_file.seek(0)
+                now = time.time()
+                try:
+                    bucket = json.loads(bucket_file.read())
+                    tokens = min(burst, bucket["tokens"] + max(now - bucket["updated"], 0) * rate)
+                except Exception:
+                    tokens = burst
+
+                wait = 0
+                if tokens >= 1 + reserve:
+                    tokens -= 1
+                else:
+                    wait = (1 + reserve - tokens) / rate
+
+                bucket_file.seek(0)
+                bucket_file.truncate()
+                json.dump({"tokens": tokens, "updated": now}, bucket_file)
+
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def _send_request(self, endpoint, action_result, method="post", **kwargs):
+        """This method sends a request to the API and retries the transient failures.
+
+        Read endpoints are retried on connection errors, timeouts and the RETRY_STATUS_CODES responses,
+        the MUTATING_ENDPOINTS only when no connection to the server could be established, as a connection
+        dropped or reset after the request was sent may have carried it out already.
+        Every attempt gets fresh authentication headers, so an advanced key never replays a nonce.
+        :param endpoint: API endpoint
+        :param action_result: object of ActionResult class
+        :param method: HTTP method
+        :return: RetVal of status and the response
+        """
         try:
-            request_func = getattr(requests, method)
+            request_func = getattr(self._session, method)
         except AttributeError:
-            return RetVal(action_result.set_status(phantom.APP_ERROR, f"Invalid method: {method}"), resp_json)
+            return RetVal(action_result.set_status(phantom.APP_ERROR, f"Invalid method: {method}"), None)
 
         # Create a URL to connect to
         url = f"{self._base_url}{endpoint}"
+        idempotent = endpoint not in MUTATING_ENDPOINTS
+        attempt = 0
+
+        while True:
+            attempt += 1
+            if attempt > 1 and "headers" in kwargs:
+                kwargs["headers"] = {**kwargs["headers"], **self.authenticationHeaders()}
+
+            try:
+                self._acquire_rate_limit_token()
+                r = request_func(url, verify=self._verify, **kwargs)
+                self._debug_connection_reuse(r)
+            except requests.exceptions.InvalidURL:
+                error_message = f"Error connecting to server. Invalid URL {url}"
+                return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), None)
+            except requests.exceptions.SSLError as e:
+                err = self._get_error_message_from_exception(e)
+                error_message = f"Error Connecting to server. {err}"
+                return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), None)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                retriable = idempotent or self._is_connection_failure(e)
+                if retriable and attempt <= self._max_retries:
+                    delay = self._get_retry_delay(attempt)
+                    self.debug_print(
+                        f"Retrying {endpoint} in {delay:.2f}s after a connection error. {self._get_error_message_from_exception(e)}"
+                    )
+                    time.sleep(delay)
+                    continue
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    error_message = f"Error connecting to server. Connection Refused from the Server for {url}"
+                else:
+                    error_message = f"Error Connecting to server. {self._get_error_message_from_exception(e)}"
+                return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), None)
+            except requests.exceptions.InvalidSchema:
+                error_message = f"Error connecting to server. No connection adapters were found for {url}"
+                return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), None)
+            except Exception as e:
+                err = self._get_error_message_from_exception(e)
+                error_message = f"Error Connecting to server. {err}"
+                return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), None)
+
+            if r.status_code in RETRY_STATUS_CODES and idempotent and attempt <= self._max_retries:
+                delay = self._get_retry_delay(attempt, r)
+                self.debug_print(f"Retrying {endpoint} in {delay:.2f}s after status code {r.status_code}")
+                r.close()
+                time.sleep(delay)
+                continue
+
+            break
+
+        if attempt > 1:
+            summary = action_result.update_summary({})
+            summary["retry_count"] = summary.get("retry_count", 0) + attempt - 1
+
+        return RetVal(phantom.APP_SUCCESS, r)
+
+    def _is_connection_failure(self, e):
+        """This method tells whether a request failed before a connection to the server was established.
+
+        :param e: exception raised by the request
+        :return: whether the request never reached the server
+        """
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return True
+        reason = e.args[0] if e.args else None
+        return isinstance(reason, MaxRetryError) and isinstance(reason.reason, NewConnectionError)
+
+    def _add_worker_retries(self, action_result, worker_result):
+        """This method adds the retries made by a worker thread, counted in its own action result, to the summary of the action.
+
+        It is called from the thread owning the action result, once the worker is done.
+        :param action_result: object of ActionResult class of the action
+        :param worker_result: object of ActionResult class of the worker
+        """
+        retry_count = (worker_result.get_summary() or {}).get("retry_count", 0)
+        if retry_count:
+            summary = action_result.update_summary({})
+            summary["retry_count"] = summary.get("retry_count", 0) + retry_count
+
+    def _run_workers(self, action_result, func, items, max_workers, label):
+        """This method calls func for every item on a bounded thread pool and collects the results on the calling thread.
+
+        Every worker reports into its own action result, so a failed item does not fail the others, and the
+        retries it made are added to the summary of the action once it is done. The workers do not log the
+        payloads, the progress messages can only be written from the calling thread.
+        :param action_result: object of ActionResult class of the action
+        :param func: function called with the action result of the worker and an item, returning a RetVal of status and response
+        :param items: list of items
+        :param max_workers: maximum number of concurrent calls
+        :param label: label of an item in the failure messages
+        :return: tuple of the responses keyed by item, in the order of the items, and the failure messages keyed by item
+        """
+        responses, failed = {}, {}
+        if not items:
+            return responses, failed
+
+        def call(item):
+            worker_result = ActionResult()
+            return func(worker_result, item), worker_result
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            for item, ((ret_val, response), worker_result) in zip(items, executor.map(call, items)):
+                self._add_worker_retries(action_result, worker_result)
+                if phantom.is_fail(ret_val):
+                    failed[item] = worker_result.get_message()
+                    self.debug_print(f"{label} {item} failed: {failed[item]}")
+                    continue
+                responses[item] = response
+
+        return responses, failed
+
+    def _get_failures_message(self, label, failed):
+        return "; ".join(f"{label} {item}: {message}" for item, message in failed.items())
+
+    def _make_rest_call(self, endpoint, action_result, method="post", **kwargs):
+        # **kwargs can be any additional parameters that requests.request accepts
+        ret_val, r = self._send_request(endpoint, action_result, method, **kwargs)
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        return self._process_response(r, action_result)
+
+    def _make_streaming_rest_call(self, endpoint, action_result, item_key=None, method="post", **kwargs):
+        """This method makes an API call whose reply items are decoded incrementally from the response body.
+
+        The body is never buffered whole nor copied into the debug data, error responses fall back to
+        the regular response processing.
+        :param endpoint: API endpoint
+        :param action_result: object of ActionResult class
+        :param item_key: key of the array to stream inside the reply object, None when the reply itself is the array
+        :param method: HTTP method
+        :return: RetVal of status and a ReplyStream
+        """
+        ret_val, r = self._send_request(endpoint, action_result, method, stream=True, **kwargs)
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        if not (200 <= r.status_code < 399 and "json" in r.headers.get("Content-Type", "")):
+            ret_val, response = self._process_response(r, action_result)
+            if phantom.is_fail(ret_val):
+                return RetVal(ret_val, None)
+            return RetVal(ret_val, ReplyStream([json.dumps(response).encode("utf-8")], item_key))
+
+        if self._log_verbosity == "verbose" and hasattr(action_result, "add_debug_data"):
+            action_result.add_debug_data({"r_status_code": r.status_code})
+            action_result.add_debug_data({"r_headers": r.headers})
 
         try:
-            r = request_func(url, verify=self._verify, **kwargs)
-        except requests.exceptions.InvalidURL:
-            error_message = f"Error connecting to server. Invalid URL {url}"
-            return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), resp_json)
-        except requests.exceptions.ConnectionError:
-            error_message = f"Error connecting to server. Connection Refused from the Server for {url}"
-            return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), resp_json)
-        except requests.exceptions.InvalidSchema:
-            error_message = f"Error connecting to server. No connection adapters were found for {url}"
-            return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), resp_json)
+            return RetVal(phantom.APP_SUCCESS, ReplyStream(r.iter_content(STREAM_CHUNK_SIZE), item_key, r))
         except Exception as e:
+            r.close()
             err = self._get_error_message_from_exception(e)
-            error_message = f"Error Connecting to server. {err}"
-            return RetVal(action_result.set_status(phantom.APP_ERROR, error_message), resp_json)
+            return RetVal(action_result.set_status(phantom.APP_ERROR, f"Unable to parse JSON response. Error: {err}"), None)
 
-        return self._process_response(r, action_result)
+    def _debug_connection_reuse(self, r):
+        # The connection pool that served the response counts the requests it served and the connections it had to open
+        pool = getattr(r.raw, "_pool", None)
+        if pool is not None:
+            self.debug_print(f"HTTP connection pool: {pool.num_requests} request(s) over {pool.num_connections} connection(s)")
 
     def authenticationHeaders(self):
         if self._advanced:
@@ -231,71 +871,1051 @@ class TestConnector(BaseConnector):
 
         return headers
 
-    def _handle_on_poll(self, param):
-        # Add an action result object to self (BaseConnector) to represent the action for this param
-        action_result = self.add_action_result(ActionResult(dict(param)))
+    def _migrate_state(self):
+        """This method moves the cursors and indexes kept in the JSON state by earlier versions into the state store.
 
-        polled_count = 0
-        incidents = []
+        A checkpoint journal left behind by an interrupted run of an earlier version is replayed first.
+        """
+        if self._state.get("state_store_version") == STATE_STORE_VERSION:
+            return
 
-        while True:
-            obj, sort, request_data, parameters = {}, {}, {}, {}
-            filters = []
-            obj["field"] = "creation_time"
-            obj["operator"] = "gte"
-            obj["value"] = self._state.get("last_incident", int((datetime.now(timezone.utc) - timedelta(days=7)).timestamp() * 1000))
-            filters.append(obj)
-            request_data["filters"] = filters
-            sort["field"] = "creation_time"
-            sort["keyword"] = "asc"
-            request_data["sort"] = sort
-            parameters["request_data"] = request_data
+        journal_path = os.path.join(self.get_state_dir(), f"{self.get_asset_id()}_checkpoint.journal")
+        try:
+            with open(journal_path) as journal:
+                lines = journal.readlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                break
+            self._state.update(entry.get("set", {}))
+            for key, values in entry.get("merge", {}).items():
+                self._state.setdefault(key, {}).update(values)
+
+        with self._store.transaction():
+            for name in ["last_incident", "last_alert", "last_modification", "backfill"]:
+                if name in self._state:
+                    self._store.set_cursor(name, self._state.pop(name))
+            for cursor_key, cursor in self._state.pop("alert_cursors", {}).items():
+                self._store.set_cursor(f"alert_cursor_{cursor_key}", cursor)
+            self._store.update_incident_index(self._state.pop("incident_index", {}))
+            self._store.add_ingested(self._state.pop("ingested_ids", {}))
+        self._state.pop("ingested_bloom", None)
+        self._state.pop("ingested_horizon", None)
+
+        self._state["state_store_version"] = STATE_STORE_VERSION
+        self.save_state(self._state)
+        if lines:
+            os.remove(journal_path)
+
+    def _checkpoint(self, set_values=None, merge_values=None):
+        """This method durably records a poll cursor advance together with the index entries of the ingested data.
+
+        Both are written in a single transaction of the state store, so an interrupted run resumes
+        from a cursor that matches the indexes.
+        :param set_values: dictionary of cursors to overwrite
+        :param merge_values: dictionary of the 'ingested_ids' and 'incident_index' entries to add
+        """
+        merge_values = merge_values or {}
+        with self._store.transaction():
+            for name, value in (set_values or {}).items():
+                self._store.set_cursor(name, value)
+            if merge_values.get("ingested_ids"):
+                self._store.add_ingested(merge_values["ingested_ids"])
+            if merge_values.get("incident_index"):
+                self._store.update_incident_index(merge_values["incident_index"])
+
+    def _get_page(self, action_result, endpoint, item_key, request_data, projection=None):
+        """This method fetches one page of a paged API, the items of the page are decoded from the streamed response.
+
+        :param action_result: object of ActionResult class
+        :param endpoint: API endpoint
+        :param item_key: key of the items array inside the reply, None when the reply itself is the array
+        :param request_data: request data of the page, including its search_from/search_to offsets
+        :param projection: function pruning every item as it is decoded, None to keep the whole items
+        :return: RetVal of status and a tuple of the other reply fields and the list of items
+        """
+        parameters = {}
+        parameters["request_data"] = request_data
+
+        # make rest call
+        headers = self.authenticationHeaders()
+        ret_val, stream = self._make_streaming_rest_call(endpoint, action_result, item_key, headers=headers, json=parameters)
+
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        try:
+            items = [projection(item) for item in stream] if projection else list(stream)
+        except Exception as e:
+            err = self._get_error_message_from_exception(e)
+            return RetVal(action_result.set_status(phantom.APP_ERROR, f"Unable to parse JSON response. Error: {err}"), None)
+        finally:
+            stream.close()
+
+        return RetVal(phantom.APP_SUCCESS, (stream.reply, items))
+
+    def _get_projected_response(self, action_result, endpoint, item_key, request_data, projection):
+        """This method makes a single API call whose reply items are pruned to the requested fields as they are decoded.
+
+        :param action_result: object of ActionResult class
+        :param endpoint: API endpoint
+        :param item_key: key of the items array inside the reply, None when the reply itself is the array
+        :param request_data: request data of the call
+        :param projection: function pruning every item
+        :return: RetVal of status and the response holding the reply fields and the pruned items
+        """
+        ret_val, page = self._get_page(action_result, endpoint, item_key, request_data, projection)
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        reply, items = page
+        if item_key is None:
+            return RetVal(phantom.APP_SUCCESS, {"reply": items})
+        reply[item_key] = items
+        return RetVal(phantom.APP_SUCCESS, {"reply": reply})
+
+    def _get_projection(self, action_result, fields, required_fields=()):
+        """This method compiles the 'fields' action parameter into a projection of the returned records.
+
+        :param action_result: object of ActionResult class
+        :param fields: comma-separated list of dotted field paths
+        :param required_fields: fields the action needs itself, kept whatever the requested fields
+        :return: RetVal of status and the projection, None when no fields are requested
+        """
+        if not fields:
+            return RetVal(phantom.APP_SUCCESS, None)
+
+        paths = [x.strip() for x in fields.split(",") if x.strip()]
+        if not paths or any("" in path.split(".") for path in paths):
+            return RetVal(action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=FIELDS_ACTION_PARAM)), None)
+
+        return RetVal(phantom.APP_SUCCESS, compile_projection(paths + list(required_fields)))
+
+    def _fetch_pages(self, action_result, endpoint, item_key, request_data, max_results, page_size, projection=None):
+        """This method fetches up to max_results items of a paged API.
+
+        The first page reveals the total_count of the result set, the remaining pages are then fetched
+        concurrently and merged in offset order so that the items keep the requested sort order.
+        :param action_result: object of ActionResult class
+        :param endpoint: API endpoint
+        :param item_key: key of the items array inside the reply
+        :param request_data: request data of the query, its search_from is the offset of the first item
+        :param max_results: maximum number of items to fetch
+        :param page_size: number of items to request per page
+        :param projection: function pruning every item as it is decoded, None to keep the whole items
+        :return: RetVal of status and the response holding the reply fields and the merged items
+        """
+        start = request_data.get("search_from", 0)
+        end = start + max_results
+
+        first_page = dict(request_data, search_from=start, search_to=min(start + page_size, end))
+        ret_val, page = self._get_page(action_result, endpoint, item_key, first_page, projection)
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        reply, items = page
+        if "total_count" in reply:
+            end = min(end, reply["total_count"])
+
+        def fetch(worker_result, offset):
+            page_data = dict(request_data, search_from=offset, search_to=min(offset + page_size, end))
+            return self._get_page(worker_result, endpoint, item_key, page_data, projection)
+
+        offsets = list(range(first_page["search_to"], end, page_size))
+        if items and offsets:
+            pages, failed_pages = self._run_workers(action_result, fetch, offsets, PAGE_FETCH_WORKERS, "Page at offset")
+            if failed_pages:
+                return RetVal(action_result.set_status(phantom.APP_ERROR, next(iter(failed_pages.values()))), None)
+            for page in pages.values():
+                items += page[1]
+
+        reply["result_count"] = len(items)
+        reply[item_key] = items
+        return RetVal(phantom.APP_SUCCESS, {"reply": reply})
+
+    def _stream_pages(
+        self, action_result, endpoint, item_key, request_data, response, max_results, page_size, time_budget=None, projection=None
+    ):
+        """This method walks the pages of a paged API within a result and a time budget.
+
+        The items are decoded from the streamed responses one at a time and appended to the reply of
+        the given response, which can already be in the action result data. The time budget is checked
+        before every page, a page in flight is always completed.
+        :param action_result: object of ActionResult class
+        :param endpoint: API endpoint
+        :param item_key: key of the items array inside the reply
+        :param request_data: request data of the query, its search_from is the offset of the first item
+        :param response: response dictionary the reply fields and the items are written to
+        :param max_results: maximum number of items to fetch
+        :param page_size: number of items to request per page
+        :param time_budget: seconds after which no further page is requested, None for no limit
+        :param projection: function pruning every item as it is decoded, None to keep the whole items
+        :return: RetVal of status and the list of page latencies in milliseconds
+        """
+        deadline = None if not time_budget else time.monotonic() + time_budget
+        reply = response.setdefault("reply", {})
+        items = reply.setdefault(item_key, [])
+        latencies = []
+
+        offset = request_data.get("search_from", 0)
+        end = offset + max_results
+        while offset < end:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.save_progress(f"Reached the time budget of {time_budget} seconds after {len(items)} results")
+                break
+
+            page_data = dict(request_data, search_from=offset, search_to=min(offset + page_size, end))
+            started = time.monotonic()
 
             # make rest call
             headers = self.authenticationHeaders()
-            ret_val, response = self._make_rest_call("/incidents/get_incidents/", action_result, headers=headers, json=parameters)
+            ret_val, stream = self._make_streaming_rest_call(
+                endpoint, action_result, item_key, headers=headers, json={"request_data": page_data}
+            )
 
             if phantom.is_fail(ret_val):
-                # the call to the 3rd party device or service failed, action result should contain all the error details
-                return action_result.get_status()
+                return RetVal(ret_val, latencies)
 
-            reply = response["reply"]
-            if reply["total_count"] == 0:
+            count = 0
+            try:
+                for item in stream:
+                    items.append(projection(item) if projection else item)
+                    count += 1
+            except Exception as e:
+                err = self._get_error_message_from_exception(e)
+                return RetVal(action_result.set_status(phantom.APP_ERROR, f"Unable to parse JSON response. Error: {err}"), latencies)
+            finally:
+                stream.close()
+
+            latencies.append(round((time.monotonic() - started) * 1000))
+            self.debug_print(f"Fetched {count} results from {endpoint} in {latencies[-1]} ms")
+
+            reply.update(stream.reply)
+            reply["result_count"] = len(items)
+            reply[item_key] = items
+            if "total_count" in reply:
+                end = min(end, reply["total_count"])
+            if not count:
                 break
-            polled_count += reply["result_count"]
-            incidents += reply["incidents"]
-            self._state.update({"last_incident": incidents[-1]["creation_time"] + 1})
-            self.save_state(self._state)
+            offset += count
+
+        return RetVal(phantom.APP_SUCCESS, latencies)
+
+    def _iter_pages(self, action_result, endpoint, item_key, filters, page_size, sort_field="creation_time"):
+        """Generator that walks the result set of a paged API one page at a time.
+
+        The filters stay fixed for the whole walk so that the search_from/search_to offsets
+        address a stable, ascending ordered result set.
+        :param action_result: object of ActionResult class
+        :param endpoint: API endpoint
+        :param item_key: key of the items array inside the reply
+        :param filters: list of filters of the query
+        :param page_size: number of items to request per page
+        :param sort_field: field to sort the result set on in ascending order
+        :return: RetVal of status and the list of items of the page, stops after a failure
+        """
+        search_from = 0
 
-            if reply["total_count"] == reply["result_count"]:
-                break
+        while True:
+            request_data = {}
+            request_data["filters"] = filters
+            request_data["search_from"] = search_from
+            request_data["search_to"] = search_from + page_size
+            request_data["sort"] = {"field": sort_field, "keyword": "asc"}
 
-        for incident in incidents:
-            cef, container = {}, {}
-            container["name"] = "Cortex XDR Incident {}".format(incident["incident_id"])
-            container["description"] = "Cortex XDR Incident"
-
-            first_cef = True
-
-            for key, value in incident.items():
-                if first_cef:
-                    cef["cortex_xdr"] = True
-                    first_cef = False
-                cef[key] = value
-                artifacts = []
-                artifact = {"label": "incident", "cef": cef}
+            ret_val, page = self._get_page(action_result, endpoint, item_key, request_data)
+            if phantom.is_fail(ret_val):
+                yield RetVal(ret_val, None)
+                return
+
+            reply, items = page
+            if not items:
+                return
+
+            yield RetVal(phantom.APP_SUCCESS, items)
+
+            search_from += len(items)
+            if search_from >= reply.get("total_count", 0):
+                return
+
+    def _get_endpoint_keys(self, endpoint):
+        """This method returns the lookup keys of an endpoint, its ID, host name, IP addresses and alias, in lower case.
+
+        :param endpoint: endpoint record
+        :return: set of lookup keys
+        """
+        keys = set()
+        for field in ENDPOINT_KEY_FIELDS:
+            values = endpoint.get(field)
+            for value in values if isinstance(values, list) else [values]:
+                if value:
+                    keys.add(str(value).strip().lower())
+        return keys
+
+    def _refresh_endpoint_inventory(self, action_result, full=False, only_due=False):
+        """This method brings the local endpoint inventory up to date.
+
+        A full walk of the endpoints replaces the inventory, which also drops the deleted endpoints and picks
+        up the host name and IP address changes. It runs once the refresh interval has elapsed since the
+        previous one, the refreshes in between only fetch the endpoints first seen since the previous refresh.
+        :param action_result: object of ActionResult class
+        :param full: whether to walk all the endpoints regardless of the refresh interval
+        :param only_due: whether to skip the refresh unless a full walk is due
+        :return: RetVal of status and a dictionary of refresh statistics
+        """
+        # Validate 'inventory_refresh_hours' asset configuration parameter
+        ret_val, refresh_hours = self._validate_integer(
+            action_result, self.get_config().get("inventory_refresh_hours", DEFAULT_INVENTORY_REFRESH_HOURS), INVENTORYREFRESHHOURS_CONFIG_PARAM
+        )
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        now = int(time.time())
+        cursor = self._store.get_cursor("endpoint_inventory")
+        full = full or not cursor or now - cursor["full_refresh"] >= refresh_hours * 3600
+        if not full and only_due:
+            return RetVal(phantom.APP_SUCCESS, {"mode": "none", "endpoints_refreshed": 0, "endpoints_removed": 0})
+        # The first_seen of an endpoint never changes, unlike its last_seen which moves on every check-in
+        filters = [] if full else [{"field": "first_seen", "operator": "gte", "value": cursor["first_seen"]}]
+        stats = {"mode": "full" if full else "incremental", "endpoints_refreshed": 0, "endpoints_removed": 0}
+
+        # The walk is ordered on first_seen too, so endpoints checking in meanwhile do not shift the pages
+        refreshed = set()
+        for ret_val, endpoints in self._iter_pages(
+            action_result, "/endpoints/get_endpoint/", "endpoints", filters, INVENTORY_PAGE_SIZE, "first_seen"
+        ):
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+            entries = [
+                (str(endpoint["endpoint_id"]), endpoint, endpoint.get("last_seen"), self._get_endpoint_keys(endpoint)) for endpoint in endpoints
+            ]
+            self._store.update_endpoints(entries)
+            refreshed.update(entry[0] for entry in entries)
+            stats["endpoints_refreshed"] += len(entries)
+
+        with self._store.transaction():
+            if full:
+                removed = self._store.get_endpoint_ids() - refreshed
+                self._store.remove_endpoints(removed)
+                stats["endpoints_removed"] = len(removed)
+            # The endpoints registered during the walk are fetched again by the next refresh
+            self._store.set_cursor(
+                "endpoint_inventory",
+                {"first_seen": now * 1000 - INVENTORY_OVERLAP_MS, "full_refresh": now if full else cursor["full_refresh"]},
+            )
+
+        return RetVal(phantom.APP_SUCCESS, stats)
+
+    def _get_endpoint_delta(self, action_result, projection=None):
+        """This method fetches the endpoints and diffs them against the content hashes recorded by the previous delta run.
+
+        Only the added and changed endpoints are kept while the response is decoded. The volatile
+        fields are left out of the hashes, so an endpoint merely checking in does not count as changed.
+        :param action_result: object of ActionResult class
+        :param projection: function pruning the returned endpoints, None to keep the whole endpoints
+        :return: RetVal of status and a tuple of the number of endpoints and the dictionary of added, changed and removed endpoints
+        """
+        previous = self._store.get_endpoint_hashes()
+        hashes = {}
+        delta = {"added": [], "changed": [], "removed": []}
+
+        def diff(endpoint):
+            endpoint_id = str(endpoint.get("agent_id", endpoint.get("endpoint_id")))
+            content = {key: value for key, value in endpoint.items() if key not in ENDPOINT_VOLATILE_FIELDS}
+            hashes[endpoint_id] = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:32]
+            if hashes[endpoint_id] != previous.get(endpoint_id):
+                delta["changed" if endpoint_id in previous else "added"].append(projection(endpoint) if projection else endpoint)
+
+        ret_val, _ = self._get_page(action_result, "/endpoints/get_endpoints/", None, {}, diff)
+        if phantom.is_fail(ret_val):
+            return RetVal(ret_val, None)
+
+        delta["removed"] = sorted(set(previous) - set(hashes))
+        self._store.update_endpoint_hashes(
+            {endpoint_id: content_hash for endpoint_id, content_hash in hashes.items() if content_hash != previous.get(endpoint_id)},
+            delta["removed"],
+        )
+
+        return RetVal(phantom.APP_SUCCESS, (len(hashes), delta))
+
+    def _build_cef(self, record, schema, passthrough=True):
+        """This method flattens a record into CEF fields in a single pass over its values.
+
+        Nested objects are flattened into underscore joined field names, null and empty values are skipped.
+        :param record: dictionary to convert
+        :param schema: CEF schema mapping a field to its (CEF field, CEF contains)
+        :param passthrough: whether fields missing from the schema are kept under their own name
+        :return: tuple of the CEF dictionary and the CEF types dictionary
+        """
+        cef, cef_types = {"cortex_xdr": True}, {}
+        pending = [("", record)]
+
+        while pending:
+            prefix, obj = pending.pop()
+            for key, value in obj.items():
+                if not value and not isinstance(value, (int, float)):
+                    continue
+                field = f"{prefix}{key}"
+                if isinstance(value, dict):
+                    pending.append((f"{field}_", value))
+                    continue
+                mapped = schema.get(field)
+                if mapped is None:
+                    if passthrough:
+                        cef[field] = value
+                    continue
+                cef[mapped[0]] = value
+                if mapped[1]:
+                    cef_types[mapped[0]] = mapped[1]
+
+        return cef, cef_types
+
+    def _build_incident_artifact(self, incident, label="incident"):
+        cef, cef_types = self._build_cef(incident, INCIDENT_CEF_SCHEMA)
+        return {"label": label, "cef": cef, "cef_types": cef_types}
+
+    def _build_incident_container(self, incident):
+        container = {}
+        container["name"] = "Cortex XDR Incident {}".format(incident["incident_id"])
+        container["description"] = "Cortex XDR Incident"
+        container["source_data_identifier"] = str(incident["incident_id"])
+        container["data"] = incident
+        container["artifacts"] = [self._build_incident_artifact(incident)]
+
+        return container
+
+    def _get_incident_extra_data(self, action_result, incident_id, alerts_limit=None):
+        request_data, parameters = {}, {}
+        request_data["incident_id"] = str(incident_id)
+        if alerts_limit:
+            request_data["alerts_limit"] = alerts_limit
+        parameters["request_data"] = request_data
+
+        # make rest call
+        headers = self.authenticationHeaders()
+        return self._make_rest_call("/incidents/get_incident_extra_data/", action_result, headers=headers, json=parameters)
+
+    def _build_mapped_artifacts(self, records, label, schema, identifier_fields, passthrough=False):
+        artifacts = []
+
+        for record in records:
+            cef, cef_types = self._build_cef(record, schema, passthrough)
+            identifier = "-".join(str(record.get(field)) for field in identifier_fields)
+            artifacts.append(
+                {
+                    "label": label,
+                    "cef": cef,
+                    "cef_types": cef_types,
+                    "source_data_identifier": "{}-{}".format(label.replace(" ", "_"), identifier),
+                }
+            )
+
+        return artifacts
+
+    def _build_extra_data_artifacts(self, reply):
+        """This method turns the reply of get_incident_extra_data into alert, file and network artifacts.
+
+        :param reply: reply of the get_incident_extra_data API
+        :return: list of artifacts
+        """
+        artifacts = []
+
+        alerts = (reply.get("alerts") or {}).get("data") or []
+        artifacts += self._build_mapped_artifacts(alerts, "alert", ALERT_CEF_SCHEMA, ["alert_id"], passthrough=True)
+
+        file_artifacts = (reply.get("file_artifacts") or {}).get("data") or []
+        artifacts += self._build_mapped_artifacts(file_artifacts, "file artifact", FILE_ARTIFACT_CEF_SCHEMA, ["file_sha256"])
+
+        network_artifacts = (reply.get("network_artifacts") or {}).get("data") or []
+        artifacts += self._build_mapped_artifacts(
+            network_artifacts, "network artifact", NETWORK_ARTIFACT_CEF_SCHEMA, ["network_remote_ip", "network_remote_port", "network_domain"]
+        )
+
+        return artifacts
+
+    def _enrich_incident_containers(self, action_result, containers, workers):
+        """This method adds the extra data of every incident to its container as typed artifacts.
+
+        The get_incident_extra_data calls run on a bounded thread pool. An incident whose extra
+        data cannot be fetched keeps its plain incident artifact.
+        :param action_result: object of ActionResult class
+        :param containers: list of incident containers to enrich in place
+        :param workers: maximum number of concurrent get_incident_extra_data calls
+        :return: number of enriched containers
+        """
+        incident_ids = [container["source_data_identifier"] for container in containers]
+        responses, _ = self._run_workers(action_result, self._get_incident_extra_data, incident_ids, workers, "Enrichment of incident")
+
+        for container in containers:
+            if container["source_data_identifier"] in responses:
+                container["artifacts"] += self._build_extra_data_artifacts(responses[container["source_data_identifier"]].get("reply") or {})
+
+        return len(responses)
+
+    def _get_incident_index_entries(self, incidents_by_id, saved):
+        """This method builds the index entries recording the container and modification time of ingested incidents.
+
+        :param incidents_by_id: dictionary of the incidents of a page keyed by incident ID
+        :param saved: list of (container, container ID) tuples returned by _save_container_batches
+        :return: dictionary of index entries keyed by incident ID
+        """
+        entries = {}
+
+        for container, container_id in saved:
+            incident = incidents_by_id[container["source_data_identifier"]]
+            entries[container["source_data_identifier"]] = [container_id, incident.get("modification_time")]
+
+        return entries
+
+    def _sync_modified_incidents(self, action_result, page_size):
+        """This method applies the incident changes since the last sync to the already ingested containers.
+
+        Only the incidents modified since the 'last_modification' cursor are requested, and only
+        the ones whose modification time moved past the indexed one get an update artifact, so the
+        work of a sync cycle follows the change volume rather than the total incident count.
+        :param action_result: object of ActionResult class
+        :param page_size: number of incidents to request per page
+        :return: RetVal of status and the number of updated containers
+        """
+        sync_start = int(datetime.now(timezone.utc).timestamp() * 1000)
+        cursor = self._store.get_cursor("last_modification", sync_start)
+        latest = cursor
+        updated_count = 0
+
+        # The pages are walked by moving the modification_time lower bound to the last one seen instead of by
+        # offsets, an incident modified during the walk only moves further ahead and the index filters the repeats.
+        # The offset only skips the incidents already seen when a whole page shares a single modification_time
+        page_start, skip = cursor, 0
+        while True:
+            request_data = {}
+            request_data["filters"] = [{"field": "modification_time", "operator": "gte", "value": page_start}]
+            request_data["search_from"] = skip
+            request_data["search_to"] = skip + page_size
+            request_data["sort"] = {"field": "modification_time", "keyword": "asc"}
+
+            ret_val, page = self._get_page(action_result, "/incidents/get_incidents/", "incidents", request_data)
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+            incidents = page[1]
+
+            # Only the indexed incidents of the page are looked up
+            index = self._store.get_incident_index(str(incident["incident_id"]) for incident in incidents)
+            artifacts, changes = [], {}
+            for incident in incidents:
+                incident_id = str(incident["incident_id"])
+                modification_time = incident.get("modification_time") or 0
+                latest = max(latest, modification_time)
+                if incident_id not in index or modification_time <= (index[incident_id][1] or 0):
+                    continue
+
+                artifact = self._build_incident_artifact(incident, label="incident update")
+                artifact["container_id"] = index[incident_id][0]
+                artifact["source_data_identifier"] = f"{incident_id}-{modification_time}"
                 artifacts.append(artifact)
-                container["data"] = incident
-                container["artifacts"] = artifacts
+                changes[incident_id] = [index[incident_id][0], modification_time]
+
+            if artifacts:
+                status, message, _ = self.save_artifacts(artifacts)
+                if phantom.is_fail(status):
+                    return RetVal(action_result.set_status(phantom.APP_ERROR, f"Container update failed: {message}"), None)
+                updated_count += len(artifacts)
+                self._checkpoint(merge_values={"incident_index": changes})
+
+            if len(incidents) < page_size:
+                break
+            last = incidents[-1].get("modification_time") or 0
+            skip = skip + len(incidents) if last == page_start else 0
+            page_start = last
 
-            status, message, container_id = self.save_container(container)
-            if status == phantom.APP_ERROR:
+        # The last minute of modifications is looked at again by the next cycle, in case the API indexes some late
+        self._checkpoint({"last_modification": max(cursor, min(latest, sync_start - SYNC_OVERLAP_MS))})
+
+        return RetVal(phantom.APP_SUCCESS, updated_count)
+
+    def _save_container_batches(self, action_result, containers, batch_size):
+        """This method submits containers through the multi-container save API in chunks.
+
+        A container rejected by the platform is reported and skipped, only a failure of the
+        whole save_containers call fails the ingestion.
+        :param action_result: object of ActionResult class
+        :param containers: list of containers to save
+        :param batch_size: maximum number of containers per save_containers call
+        :return: RetVal of status and a tuple of saved (container, container ID) pairs and failed container names
+        """
+        saved, failed = [], []
+
+        for index in range(0, len(containers), batch_size):
+            batch = containers[index : index + batch_size]
+            status, message, responses = self.save_containers(batch)
+            if phantom.is_fail(status):
                 self.debug_print(f"Failed to store: {message}")
                 self.debug_print(f"stat/msg {status}/{message}")
-                return action_result.set_status(phantom.APP_ERROR, f"Container creation failed: {message}")
+                return RetVal(action_result.set_status(phantom.APP_ERROR, f"Container creation failed: {message}"), None)
+
+            for container, response in zip(batch, responses or []):
+                if response.get("failed") or not (response.get("success") or response.get("id") or response.get("existing_container_id")):
+                    self.debug_print(f"Failed to store {container['name']}: {response.get('message')}")
+                    failed.append(container["name"])
+                else:
+                    saved.append((container, response.get("id") or response.get("existing_container_id")))
+
+        return RetVal(phantom.APP_SUCCESS, (saved, failed))
+
+    def _get_poll_settings(self, action_result, param):
+        """This method validates the on_poll parameters and the polling asset configuration.
+
+        :param action_result: object of ActionResult class
+        :param param: dictionary of on_poll parameters
+        :return: RetVal of status and a dictionary of poll settings
+        """
+        config = self.get_config()
+        settings = {}
+
+        # Validate the numeric asset configuration parameters and their ranges
+        for key, value, minimum, maximum, config_param in [
+            ("page_size", config.get("poll_page_size", DEFAULT_POLL_PAGE_SIZE), 1, MAX_POLL_PAGE_SIZE, POLLPAGESIZE_CONFIG_PARAM),
+            ("batch_size", config.get("ingest_batch_size", DEFAULT_INGEST_BATCH_SIZE), 1, None, INGESTBATCHSIZE_CONFIG_PARAM),
+            ("workers", config.get("enrichment_workers", DEFAULT_ENRICHMENT_WORKERS), 1, MAX_WORKERS, ENRICHMENTWORKERS_CONFIG_PARAM),
+            ("backfill_workers", config.get("backfill_workers", DEFAULT_BACKFILL_WORKERS), 1, MAX_WORKERS, BACKFILLWORKERS_CONFIG_PARAM),
+        ]:
+            ret_val, settings[key] = self._validate_integer(action_result, value, config_param)
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+            if settings[key] < minimum or (maximum and settings[key] > maximum):
+                if not maximum:
+                    return RetVal(action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=config_param)), None)
+                return RetVal(
+                    action_result.set_status(phantom.APP_ERROR, RANGE_INTEGER_MSG.format(min=minimum, max=maximum, key=config_param)), None
+                )
+
+        settings["sync_updates"] = config.get("sync_incident_updates", False)
+        settings["enrich"] = config.get("enrich_incidents", False)
+        settings["ingest_alerts"] = config.get("ingest_alerts", False)
+
+        # Validate the 'container_count', 'start_time' and 'end_time' action parameters
+        for key, param_key in [
+            ("container_count", CONTAINERCOUNT_ACTION_PARAM),
+            ("start_time", STARTTIME_ACTION_PARAM),
+            ("end_time", ENDTIME_ACTION_PARAM),
+        ]:
+            ret_val, settings[key] = self._validate_integer(action_result, param.get(key), param_key)
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+        if settings["start_time"] and settings["end_time"] and settings["start_time"] > settings["end_time"]:
+            return RetVal(action_result.set_status(phantom.APP_ERROR, INVALID_TIME_RANGE_MSG), None)
+
+        return RetVal(phantom.APP_SUCCESS, settings)
+
+    def _ingest_incidents(self, action_result, incidents, settings, stats, limit=None):
+        """This method turns incidents into containers, enriches and saves them.
+
+        :param action_result: object of ActionResult class
+        :param incidents: list of incidents to ingest
+        :param settings: dictionary of poll settings
+        :param stats: dictionary of poll counters updated in place
+        :param limit: maximum number of containers to create, None for no limit
+        :return: RetVal of status and a tuple of the state entries recording the saved containers, to merge at the
+            next checkpoint, the number of leading incidents handled, the following ones are left out by the limit, and
+            the creation_time of the first incident whose container was rejected and is to be retried, None when there is none
+        """
+        # Incidents ingested by an earlier poll of the same time range are dropped before any platform call,
+        # so they do not count against the limit
+        ingested = self._store.get_ingested(f"incident-{incident['incident_id']}" for incident in incidents)
+        new_incidents, handled = [], 0
+        for incident in incidents:
+            if f"incident-{incident['incident_id']}" not in ingested:
+                if limit is not None and len(new_incidents) >= limit:
+                    break
+                new_incidents.append(incident)
+            handled += 1
+        stats["duplicates"] += handled - len(new_incidents)
+
+        containers = [self._build_incident_container(incident) for incident in new_incidents]
+        if settings["enrich"]:
+            stats["enriched"] += self._enrich_incident_containers(action_result, containers, settings["workers"])
+
+        ingest_start = time.monotonic()
+        ret_val, result = self._save_container_batches(action_result, containers, settings["batch_size"])
+        stats["ingest_time"] += time.monotonic() - ingest_start
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        stats["polled"] += handled
+        stats["saved"] += len(result[0])
+        stats["failed"] += result[1]
+        self.send_progress(f"{stats['polled']} incident(s) ingested")
+
+        merge_values = {}
+        merge_values["ingested_ids"] = {
+            f"incident-{container['source_data_identifier']}": container["data"].get("creation_time") for container, _ in result[0]
+        }
+        if settings["sync_updates"]:
+            merge_values["incident_index"] = self._get_incident_index_entries({str(i["incident_id"]): i for i in new_incidents}, result[0])
+
+        # The rejected incidents stay out of the ingested ID index, the cursor must not move past them until they
+        # were attempted MAX_CONTAINER_ATTEMPTS times, they are then reported as abandoned and the cursor moves on
+        saved_ids = {container["source_data_identifier"] for container, _ in result[0]}
+        rejected = self._store.get_cursor("rejected_incidents", {})
+        changed = False
+        failed_times = []
+        for incident in new_incidents:
+            incident_id = str(incident["incident_id"])
+            if incident_id in saved_ids:
+                changed = rejected.pop(incident_id, None) is not None or changed
+                continue
+            attempts = rejected.get(incident_id, [0])[0] + 1
+            rejected[incident_id] = [attempts, incident["creation_time"]]
+            changed = True
+            if attempts < MAX_CONTAINER_ATTEMPTS:
+                failed_times.append(incident["creation_time"])
+            else:
+                stats["abandoned"].append(incident_id)
+        if changed:
+            retention_start = int((time.time() - INGESTED_IDS_RETENTION_DAYS * 86400) * 1000)
+            self._store.set_cursor(
+                "rejected_incidents", {incident_id: entry for incident_id, entry in rejected.items() if entry[1] >= retention_start}
+            )
+
+        return RetVal(phantom.APP_SUCCESS, (merge_values, handled, min(failed_times) if failed_times else None))
+
+    def _build_alert_containers(self, alerts):
+        """This method groups alerts into the containers of their incidents, one alert artifact per alert.
+
+        The alerts must belong to ingested incidents, whose containers get the artifacts added. The alert
+        artifacts share the source data identifiers of the enrichment ones so that an alert is never added twice.
+        :param alerts: list of alerts
+        :return: tuple of the list of containers and the alerts of every container keyed by source data identifier
+        """
+        containers, alerts_by_container = {}, {}
+
+        for alert in alerts:
+            incident_id = alert.get("incident_id")
+            if not incident_id:
+                self.debug_print(f"Skipping alert {alert.get('alert_id')} that is not part of an incident")
+                continue
+            if str(incident_id) not in containers:
+                container = {}
+                container["name"] = f"Cortex XDR Incident {incident_id}"
+                container["description"] = "Cortex XDR Incident"
+                container["source_data_identifier"] = str(incident_id)
+                container["artifacts"] = []
+                containers[str(incident_id)] = container
+                alerts_by_container[str(incident_id)] = []
+            containers[str(incident_id)]["artifacts"] += self._build_mapped_artifacts(
+                [alert], "alert", ALERT_CEF_SCHEMA, ["alert_id"], passthrough=True
+            )
+            alerts_by_container[str(incident_id)].append(alert)
+
+        return list(containers.values()), alerts_by_container
+
+    def _ingest_alerts(self, action_result, start_time, settings, stats, poll_now, polled_until):
+        """This method adds the alerts created since the 'last_alert' cursor to the containers of their incidents.
+
+        Only the alerts of incidents already ingested are added, so that no container is created for an
+        incident that has not been polled yet. The cursor stays at the first alert deferred that way, or
+        rejected by the platform, so the next poll picks it up again. The alerts are deferred as long as the
+        incident polling, held back by the container count, a backfill or a rejected container, has not
+        reached them. An alert created more than ALERT_DEFER_MAX_MS before polled_until belongs to an incident
+        that is not going to be polled, such as one created before the poll start, and is dropped.
+
+        :param action_result: object of ActionResult class
+        :param start_time: creation time the alerts are polled from when the cursor is not used
+        :param settings: dictionary of poll settings
+        :param stats: dictionary of poll counters updated in place
+        :param poll_now: whether the poll is a manual one, which does not move the cursor
+        :param polled_until: creation time up to which all the incidents have been polled
+        :return: status
+        """
+        if not poll_now:
+            start_time = self._store.get_cursor("last_alert", start_time)
+        filters = [{"field": "creation_time", "operator": "gte", "value": start_time}]
+        if settings["end_time"]:
+            filters.append({"field": "creation_time", "operator": "lte", "value": settings["end_time"]})
+        defer_horizon = polled_until - ALERT_DEFER_MAX_MS
+        hold = None
+
+        for ret_val, alerts in self._iter_pages(action_result, "/alerts/get_alerts_multi_events/", "alerts", filters, settings["page_size"]):
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+            # The alerts at the cursor timestamp are polled again, the ingested ID index drops them
+            ingested = self._store.get_ingested(f"alert-{alert['alert_id']}" for alert in alerts)
+            new_alerts = [alert for alert in alerts if f"alert-{alert['alert_id']}" not in ingested]
+            stats["alerts_polled"] += len(alerts)
+            stats["duplicates"] += len(alerts) - len(new_alerts)
+
+            polled_incidents = self._store.get_ingested({f"incident-{alert['incident_id']}" for alert in new_alerts if alert.get("incident_id")})
+            ready, held = [], []
+            for alert in new_alerts:
+                if not alert.get("incident_id") or f"incident-{alert['incident_id']}" in polled_incidents:
+                    ready.append(alert)
+                elif (alert.get("creation_time") or 0) >= defer_horizon:
+                    held.append(alert)
+                else:
+                    self.debug_print(f"Dropping alert {alert.get('alert_id')} of incident {alert['incident_id']} that was never ingested")
+            stats["alerts_deferred"] += len(held)
+
+            containers, alerts_by_container = self._build_alert_containers(ready)
+            ret_val, result = self._save_container_batches(action_result, containers, settings["batch_size"])
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+            ingested_ids, saved_ids = {}, set()
+            for container, _ in result[0]:
+                saved_ids.add(container["source_data_identifier"])
+                for alert in alerts_by_container[container["source_data_identifier"]]:
+                    ingested_ids[f"alert-{alert['alert_id']}"] = alert.get("creation_time")
+            stats["alerts_ingested"] += len(ingested_ids)
+            stats["failed"] += result[1]
+            held += [alert for alert in ready if alert.get("incident_id") and str(alert["incident_id"]) not in saved_ids]
+
+            # The cursor is built from creation_time, the field the query filters and sorts on
+            hold_times = [alert["creation_time"] for alert in held if alert.get("creation_time") is not None]
+            if hold_times:
+                hold = min(hold_times) if hold is None else min(hold, *hold_times)
+            cursor = hold if hold is not None else alerts[-1].get("creation_time")
+            self._checkpoint(None if poll_now or cursor is None else {"last_alert": cursor}, {"ingested_ids": ingested_ids})
+
+        return phantom.APP_SUCCESS
+
+    def _fetch_backfill_shard(self, worker_result, shard, page_size, pages, stop):
+        """This method fetches the incidents of a backfill shard page by page, it runs on a backfill worker thread.
+
+        The pages are handed over through a bounded queue, so a worker prefetching a later shard
+        blocks once the queue is full instead of accumulating the whole shard.
+        :param worker_result: object of ActionResult class the worker reports into
+        :param shard: list of the inclusive [start, end] creation_time range of the shard
+        :param page_size: number of incidents to request per page
+        :param pages: queue receiving a (status, incidents) tuple per page, then (status, None) at the end of the
+            shard or (status, error message) after a failure or an unexpected error
+        :param stop: event set when the backfill stops consuming the pages
+        """
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        filters = [
+            {"field": "creation_time", "operator": "gte", "value": shard[0]},
+            {"field": "creation_time", "operator": "lte", "value": shard[1]},
+        ]
+        try:
+            for ret_val, page in self._iter_pages(worker_result, "/incidents/get_incidents/", "incidents", filters, page_size):
+                if phantom.is_fail(ret_val):
+                    put((ret_val, worker_result.get_message()))
+                    return
+                if not put((phantom.APP_SUCCESS, page)):
+                    return
+        except Exception as e:
+            # The backfill waits on the queue, an unexpected error is handed over like a failed page
+            put(
+                (
+                    phantom.APP_ERROR,
+                    f"Error while fetching the backfill shard starting at {shard[0]}. {self._get_error_message_from_exception(e)}",
+                )
+            )
+            return
+        put((phantom.APP_SUCCESS, None))
+
+    def _run_backfill(self, action_result, start_time, end_time, settings, stats, budget):
+        """This method catches up a long polling gap by fetching disjoint creation_time shards concurrently.
+
+        The backfill range is split into BACKFILL_SHARD_MS long shards persisted in the 'backfill'
+        state key. The shards are ingested one at a time and page by page, in shard order, so the
+        containers are still created in creation_time order, while 'backfill_workers' threads
+        prefetch the pages of the following shards. Every shard start is checkpointed as its
+        incidents are saved, an interrupted backfill resumes the unfinished shards.
+        :param action_result: object of ActionResult class
+        :param start_time: creation_time the backfill starts from when none is in progress
+        :param end_time: creation_time the backfill ends at when none is in progress
+        :param settings: dictionary of poll settings
+        :param stats: dictionary of poll counters updated in place
+        :param budget: maximum number of containers to create, None for no limit
+        :return: RetVal of status and whether the backfill is complete
+        """
+        backfill = self._store.get_cursor("backfill")
+        if not backfill:
+            shards = [[start, min(start + BACKFILL_SHARD_MS - 1, end_time)] for start in range(start_time, end_time + 1, BACKFILL_SHARD_MS)]
+            backfill = {"end": end_time, "shards": shards}
+            self._checkpoint({"backfill": backfill})
+        self.save_progress(f"Backfilling {len(backfill['shards'])} time shard(s) with {settings['backfill_workers']} worker(s)")
+
+        # The shards holding rejected incidents are kept, starting at the first of them, for the next poll
+        shards, held = list(backfill["shards"]), False
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=settings["backfill_workers"]) as executor:
+            queues, worker_results = [], []
+            try:
+                for position, shard in enumerate(shards):
+                    # Keep the current shard and the following ones up to the number of workers in flight
+                    while len(queues) < min(position + settings["backfill_workers"], len(shards)):
+                        # Every worker reports into its own action result
+                        pages, worker_result = queue.Queue(maxsize=BACKFILL_PREFETCH_PAGES), ActionResult()
+                        executor.submit(self._fetch_backfill_shard, worker_result, shards[len(queues)], settings["page_size"], pages, stop)
+                        queues.append(pages)
+                        worker_results.append(worker_result)
+
+                    hold = None
+                    while True:
+                        ret_val, incidents = queues[position].get()
+                        if phantom.is_fail(ret_val) or incidents is None:
+                            # The worker of the shard is done
+                            self._add_worker_retries(action_result, worker_results[position])
+                        if phantom.is_fail(ret_val):
+                            return RetVal(action_result.set_status(phantom.APP_ERROR, incidents), None)
+                        if incidents is None:
+                            break
+
+                        limit = None if budget is None else budget - stats["saved"]
+                        ret_val, result = self._ingest_incidents(action_result, incidents, settings, stats, limit)
+                        if phantom.is_fail(ret_val):
+                            return RetVal(action_result.get_status(), None)
+                        merge_values, handled, failed_time = result
+                        hold = failed_time if hold is None else hold
+                        shard[0] = incidents[handled - 1]["creation_time"] if hold is None else hold
+                        self._checkpoint({"backfill": backfill}, merge_values)
+
+                        if handled < len(incidents) or (budget is not None and stats["saved"] >= budget):
+                            return RetVal(phantom.APP_SUCCESS, False)
+
+                    if hold is not None:
+                        held = True
+                        continue
+                    backfill["shards"].remove(shard)
+                    self._checkpoint({"backfill": backfill})
+            finally:
+                # Unblock the workers still prefetching
+                stop.set()
+
+        if held:
+            return RetVal(phantom.APP_SUCCESS, False)
+
+        with self._store.transaction():
+            self._store.delete_cursor("backfill")
+            self._checkpoint({"last_incident": backfill["end"]})
+        return RetVal(phantom.APP_SUCCESS, True)
+
+    def _handle_on_poll(self, param):
+        # Add an action result object to self (BaseConnector) to represent the action for this param
+        action_result = self.add_action_result(ActionResult(dict(param)))
+
+        ret_val, settings = self._get_poll_settings(action_result, param)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        # A manual poll ingests the requested time range without moving the scheduled polling
+        # cursor, a scheduled poll resumes from the cursor and only falls back to the start time
+        poll_now = self.is_poll_now()
+        now = int(datetime.now(timezone.utc).timestamp() * 1000)
+        first_run_time = int((datetime.now(timezone.utc) - timedelta(days=FIRST_RUN_LOOKBACK_DAYS)).timestamp() * 1000)
+        start_time = settings["start_time"] or first_run_time
+        if not poll_now:
+            start_time = self._store.get_cursor("last_incident", start_time)
+        budget = settings["container_count"]
+        stats = {
+            "polled": 0,
+            "saved": 0,
+            "enriched": 0,
+            "failed": [],
+            "abandoned": [],
+            "ingest_time": 0.0,
+            "duplicates": 0,
+            "alerts_polled": 0,
+            "alerts_ingested": 0,
+            "alerts_deferred": 0,
+        }
+
+        # A scheduled poll that is far behind catches up through the sharded backfill first
+        backfill_done = True
+        if (
+            not poll_now
+            and settings["backfill_workers"] > 1
+            and (self._store.get_cursor("backfill") or start_time < now - BACKFILL_THRESHOLD_MS)
+        ):
+            ret_val, backfill_done = self._run_backfill(action_result, start_time, settings["end_time"] or now, settings, stats, budget)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            start_time = self._store.get_cursor("last_incident", start_time)
+
+        filters = [{"field": "creation_time", "operator": "gte", "value": start_time}]
+        if settings["end_time"]:
+            filters.append({"field": "creation_time", "operator": "lte", "value": settings["end_time"]})
+
+        # Every page is turned into containers as soon as it arrives, the checkpoint
+        # only moves once all the incidents of the page have been saved
+        pages = self._iter_pages(action_result, "/incidents/get_incidents/", "incidents", filters, settings["page_size"])
+        hold = None
+        polled_until = start_time
+        budget_reached = budget is not None and stats["saved"] >= budget
+        while backfill_done and not budget_reached:
+            ret_val, incidents = next(pages, RetVal(phantom.APP_SUCCESS, None))
+            if phantom.is_fail(ret_val):
+                # the call to the 3rd party device or service failed, action result should contain all the error details
+                return action_result.get_status()
+            if incidents is None:
+                if hold is None:
+                    # Every incident of the poll range has been polled
+                    polled_until = settings["end_time"] or now
+                break
+
+            # The container count limits the containers created, the incidents already ingested do not count
+            limit = None if budget is None else budget - stats["saved"]
+            ret_val, result = self._ingest_incidents(action_result, incidents, settings, stats, limit)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            merge_values, handled, failed_time = result
+            # The incidents created at the cursor time are polled again, the ingested ID index drops them. The cursor
+            # stays at the first rejected incident, so it is retried by the next poll and the saved ones are skipped
+            hold = failed_time if hold is None else hold
+            cursor = incidents[handled - 1]["creation_time"] if hold is None else hold
+            self._checkpoint(None if poll_now else {"last_incident": cursor}, merge_values)
+            polled_until = cursor
+            budget_reached = handled < len(incidents) or (budget is not None and stats["saved"] >= budget)
+
+        if budget_reached:
+            self.save_progress(f"Reached the container count of {budget}, the remaining incidents are left for the next poll")
+
+        if settings["ingest_alerts"]:
+            ret_val = self._ingest_alerts(action_result, settings["start_time"] or first_run_time, settings, stats, poll_now, polled_until)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+        if settings["sync_updates"]:
+            ret_val, updated_count = self._sync_modified_incidents(action_result, settings["page_size"])
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+        summary = action_result.update_summary({})
+        summary["incidents_polled"] = stats["polled"]
+        summary["containers_saved"] = stats["saved"]
+        summary["containers_failed"] = len(stats["failed"])
+        summary["containers_per_second"] = round(stats["saved"] / stats["ingest_time"], 2) if stats["ingest_time"] else 0
+        summary["duplicates_skipped"] = stats["duplicates"]
+        if settings["enrich"]:
+            summary["incidents_enriched"] = stats["enriched"]
+        if settings["ingest_alerts"]:
+            summary["alerts_polled"] = stats["alerts_polled"]
+            summary["alerts_ingested"] = stats["alerts_ingested"]
+            summary["alerts_deferred"] = stats["alerts_deferred"]
+        if stats["failed"]:
+            summary["failed_containers"] = stats["failed"]
+        if stats["abandoned"]:
+            summary["containers_abandoned"] = len(stats["abandoned"])
+            summary["abandoned_incidents"] = stats["abandoned"]
+        if settings["sync_updates"]:
+            summary["containers_updated"] = updated_count
 
         # Return success
-        self.save_progress(f"{polled_count} incident(s) polled")
+        self.save_progress(f"{stats['polled']} incident(s) polled")
         return action_result.set_status(phantom.APP_SUCCESS)
 
     def _handle_test_connectivity(self, param):
@@ -304,10 +1924,10 @@ class TestConnector(BaseConnector):
 
         self.save_progress("Connecting to API server")
 
-        # make rest call
+        # make rest call, a single endpoint is enough to check the credentials
         headers = self.authenticationHeaders()
-        parameters = {}
-        ret_val, response = self._make_rest_call("/endpoints/get_endpoints/", action_result, headers=headers, json=parameters)
+        parameters = {"request_data": {"search_from": 0, "search_to": 1}}
+        ret_val, response = self._make_rest_call("/endpoints/get_endpoint/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
             # the call to the 3rd party device or service failed, action result should contain all the error details
@@ -325,12 +1945,24 @@ class TestConnector(BaseConnector):
         # Add an action result object to self (BaseConnector) to represent the action for this param
         action_result = self.add_action_result(ActionResult(dict(param)))
 
+        # Access action parameters passed in the 'param' dictionary
+        ret_val, projection = self._get_projection(action_result, param.get("fields"))
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        if param.get("delta", False):
+            return self._list_endpoint_delta(action_result, projection)
+
         parameters = {}
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
-        # make rest call
-        headers = self.authenticationHeaders()
-        ret_val, response = self._make_rest_call("/endpoints/get_endpoints/", action_result, headers=headers, json=parameters)
+        if projection:
+            # The endpoints are pruned to the requested fields as they are decoded
+            ret_val, response = self._get_projected_response(action_result, "/endpoints/get_endpoints/", None, parameters, projection)
+        else:
+            # make rest call
+            headers = self.authenticationHeaders()
+            ret_val, response = self._make_rest_call("/endpoints/get_endpoints/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
             # the call to the 3rd party device or service failed, action result should contain all the error details
@@ -338,16 +1970,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["endpoint_count"] = str(len(reply))
-            for x in range(len(reply)):
-                summary[f"endpoint_{x + 1}"] = reply[x]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response, reply, "endpoint_{}")
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -355,7 +1985,30 @@ class TestConnector(BaseConnector):
         # BaseConnector will create a textual message based off of the summary dictionary
         return action_result.set_status(phantom.APP_SUCCESS)
 
-    def _handle_get_policy(self, param):
+    def _list_endpoint_delta(self, action_result, projection):
+        """This method runs list endpoints in delta mode, returning only the endpoints added, changed or removed since the previous delta run.
+
+        :param action_result: object of ActionResult class
+        :param projection: function pruning the returned endpoints, None to keep the whole endpoints
+        :return: status success/failure
+        """
+        ret_val, result = self._get_endpoint_delta(action_result, projection)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        endpoint_count, delta = result
+        action_result.add_data(delta)
+
+        summary = action_result.update_summary({})
+        summary["endpoint_count"] = str(endpoint_count)
+        summary["endpoints_added"] = len(delta["added"])
+        summary["endpoints_changed"] = len(delta["changed"])
+        summary["endpoints_removed"] = len(delta["removed"])
+        self._add_legacy_summary(summary, delta, delta["added"] + delta["changed"], "endpoint_{}")
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _handle_find_endpoint(self, param):
         # use self.save_progress(...) to send progress messages back to the platform
         self.save_progress(f"In action handler for: {self.get_action_identifier()}")
 
@@ -363,39 +2016,56 @@ class TestConnector(BaseConnector):
         action_result = self.add_action_result(ActionResult(dict(param)))
 
         # Access action parameters passed in the 'param' dictionary
-        endpoint_id = param["endpoint_id"]
+        value = param["value"].strip().lower()
+        if not value:
+            return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=VALUE_ACTION_PARAM))
 
+        # Resolve the value from the local inventory, which is only fully refreshed once per refresh interval or when
+        # asked to. An unknown value may belong to an endpoint registered since the previous refresh, those are fetched
+        ret_val, stats = self._refresh_endpoint_inventory(action_result, full=param.get("refresh", False), only_due=True)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+        endpoints = self._store.find_endpoints(value)
+        if not endpoints and stats["mode"] == "none":
+            ret_val, stats = self._refresh_endpoint_inventory(action_result)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            endpoints = self._store.find_endpoints(value)
+
+        for endpoint in endpoints:
+            action_result.add_data(endpoint)
+
+        summary = action_result.update_summary({})
+        summary["endpoint_count"] = len(endpoints)
+        summary["inventory_refresh"] = stats["mode"]
+        summary["endpoints_refreshed"] = stats["endpoints_refreshed"]
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _get_policy(self, action_result, endpoint_id):
+        """This method fetches the policy of an endpoint.
+
+        :param action_result: object of ActionResult class
+        :param endpoint_id: endpoint ID
+        :return: RetVal of status and the response
+        """
         request_data, parameters = {}, {}
         request_data["endpoint_id"] = endpoint_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
 
         # make rest call
         headers = self.authenticationHeaders()
         ret_val, response = self._make_rest_call("/endpoints/get_policy/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
-            # the call to the 3rd party device or service failed, action result should contain all the error details
-            return action_result.get_status()
+            return RetVal(ret_val, None)
 
-        # Add the response into the data section
-        action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        if not isinstance(response, dict) or "policy_name" not in (response.get("reply") or {}):
+            return RetVal(action_result.set_status(phantom.APP_ERROR, ERR_PARSING_RESPONSE), None)
 
-        try:
-            # Add a dictionary that is made up of the most important values from data into the summary
-            summary = action_result.update_summary({})
-            reply = response["reply"]
-            summary["policy_name"] = reply["policy_name"]
-            summary["raw"] = response
-        except Exception:
-            self.debug_print(ERR_PARSING_RESPONSE)
-
-        # Return success, no need to set the message, only the status
-        # BaseConnector will create a textual message based off of the summary dictionary
-        return action_result.set_status(phantom.APP_SUCCESS)
+        return RetVal(phantom.APP_SUCCESS, response)
 
-    def _handle_get_action_status(self, param):
+    def _handle_get_policy(self, param):
         # use self.save_progress(...) to send progress messages back to the platform
         self.save_progress(f"In action handler for: {self.get_action_identifier()}")
 
@@ -403,37 +2073,196 @@ class TestConnector(BaseConnector):
         action_result = self.add_action_result(ActionResult(dict(param)))
 
         # Access action parameters passed in the 'param' dictionary
-        action_id = param["action_id"]
-        # Validate 'action_id' action parameter
-        ret_val, action_id = self._validate_integer(action_result, action_id, ACTIONID_ACTION_PARAM)
+        endpoint_ids = list(dict.fromkeys(x.strip() for x in param["endpoint_id"].split(",") if x.strip()))
+        bypass_cache = param.get("bypass_cache", False)
+
+        if not endpoint_ids:
+            return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=ENDPOINTID_ACTION_PARAM))
+
+        # Validate 'policy_cache_ttl' asset configuration parameter
+        ret_val, cache_ttl = self._validate_integer(
+            action_result, self.get_config().get("policy_cache_ttl", DEFAULT_POLICY_CACHE_TTL), POLICYCACHETTL_CONFIG_PARAM
+        )
         if phantom.is_fail(ret_val):
             return action_result.get_status()
 
+        # The cached policy names are served locally, only the misses are fetched
+        cached = self._store.cache_get("policy", endpoint_ids) if cache_ttl and not bypass_cache else {}
+        misses = [endpoint_id for endpoint_id in endpoint_ids if endpoint_id not in cached]
+
+        if misses:
+            self._log_payload("Request JSON", {"endpoint_ids": misses})
+        responses, failed_endpoints = self._run_workers(action_result, self._get_policy, misses, POLICY_FETCH_WORKERS, "Endpoint")
+        if responses:
+            self._log_payload("Response JSON", list(responses.values()))
+            if cache_ttl:
+                self._store.cache_set(
+                    "policy", {endpoint_id: response["reply"]["policy_name"] for endpoint_id, response in responses.items()}, cache_ttl
+                )
+
+        if not (cached or responses):
+            return action_result.set_status(
+                phantom.APP_ERROR, f"Unable to get the policy. {self._get_failures_message('Endpoint', failed_endpoints)}"
+            )
+
+        # Add the response of every endpoint into the data section, in the requested order
+        policy_names = {}
+        for endpoint_id in endpoint_ids:
+            if endpoint_id in cached:
+                response = {"reply": {"policy_name": cached[endpoint_id]}}
+            elif endpoint_id in responses:
+                response = responses[endpoint_id]
+            else:
+                continue
+            action_result.add_data({"endpoint_id": endpoint_id, "cached": endpoint_id in cached, **response})
+            policy_names[endpoint_id] = response["reply"]["policy_name"]
+
+        # Add a dictionary that is made up of the most important values from data into the summary
+        summary = action_result.update_summary({})
+        summary["policy_name"] = next(iter(policy_names.values()))
+        if responses:
+            self._add_legacy_summary(summary, next(iter(responses.values())))
+        if len(endpoint_ids) > 1:
+            summary["policy_names"] = policy_names
+        summary["cache_hits"] = len(cached)
+        summary["cache_misses"] = len(misses)
+        summary["endpoints_failed"] = len(failed_endpoints)
+        if failed_endpoints:
+            summary["failed_endpoints"] = failed_endpoints
+
+        # Return success, no need to set the message, only the status
+        # BaseConnector will create a textual message based off of the summary dictionary
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _get_action_status(self, action_result, action_id):
+        """This method fetches the status of a group action on each of its endpoints.
+
+        :param action_result: object of ActionResult class
+        :param action_id: group action ID
+        :return: RetVal of status and the response
+        """
         request_data, parameters = {}, {}
         request_data["group_action_id"] = action_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
 
         # make rest call
         headers = self.authenticationHeaders()
         ret_val, response = self._make_rest_call("/actions/get_action_status/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
-            # the call to the 3rd party device or service failed, action result should contain all the error details
+            return RetVal(ret_val, None)
+
+        if not isinstance(response, dict) or not isinstance((response.get("reply") or {}).get("data"), dict):
+            return RetVal(action_result.set_status(phantom.APP_ERROR, ERR_PARSING_RESPONSE), None)
+
+        return RetVal(phantom.APP_SUCCESS, response)
+
+    def _handle_get_action_status(self, param):
+        # use self.save_progress(...) to send progress messages back to the platform
+        self.save_progress(f"In action handler for: {self.get_action_identifier()}")
+
+        # Add an action result object to self (BaseConnector) to represent the action for this param
+        action_result = self.add_action_result(ActionResult(dict(param)))
+
+        # Access action parameters passed in the 'param' dictionary
+        action_ids = [x.strip() for x in str(param["action_id"]).split(",") if x.strip()]
+        wait = param.get("wait", False)
+
+        if not action_ids:
+            return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=ACTIONID_ACTION_PARAM))
+        validated_ids = []
+        for action_id in action_ids:
+            # Validate 'action_id' action parameter
+            ret_val, action_id = self._validate_integer(action_result, action_id, ACTIONID_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            if action_id not in validated_ids:
+                validated_ids.append(action_id)
+        # Validate 'wait_timeout' action parameter
+        ret_val, wait_timeout = self._validate_integer(
+            action_result, param.get("wait_timeout", DEFAULT_ACTION_WAIT_TIMEOUT), WAITTIMEOUT_ACTION_PARAM
+        )
+        if phantom.is_fail(ret_val):
             return action_result.get_status()
 
-        # Add the response into the data section
-        action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        # The statuses of the actions that reached a terminal state never change and are served locally
+        cached = {int(action_id): statuses for action_id, statuses in self._store.cache_get("action_status", map(str, validated_ids)).items()}
+        pending = [action_id for action_id in validated_ids if action_id not in cached]
+
+        def is_terminal(statuses):
+            return bool(statuses) and all(status in ACTION_TERMINAL_STATUSES for status in statuses.values())
+
+        responses, failed_actions, poll_count = {}, {}, 0
+        deadline = time.monotonic() + wait_timeout
+        next_poll = dict.fromkeys(pending, time.monotonic())
+        intervals = dict.fromkeys(pending, ACTION_POLL_MIN_INTERVAL)
+        if pending:
+            self._log_payload("Request JSON", {"group_action_ids": pending})
+        while pending:
+            due = [action_id for action_id in pending if next_poll[action_id] <= time.monotonic()]
+            poll_count += len(due)
+            results, failed = self._run_workers(action_result, self._get_action_status, due, ACTION_STATUS_WORKERS, "Action")
+            failed_actions.update(failed)
+            for action_id in due:
+                if action_id in failed:
+                    pending.remove(action_id)
+                    continue
+                statuses = results[action_id]["reply"]["data"]
+                if is_terminal(statuses):
+                    self._store.cache_set("action_status", {str(action_id): statuses})
+                    pending.remove(action_id)
+                elif action_id in responses and responses[action_id]["reply"]["data"] == statuses:
+                    # Back off while the action makes no progress
+                    intervals[action_id] = min(intervals[action_id] * ACTION_POLL_BACKOFF, ACTION_POLL_MAX_INTERVAL)
+                else:
+                    intervals[action_id] = ACTION_POLL_MIN_INTERVAL
+                responses[action_id] = results[action_id]
+                next_poll[action_id] = time.monotonic() + intervals[action_id]
 
-        try:
-            # Add a dictionary that is made up of the most important values from data into the summary
-            summary = action_result.update_summary({})
-            reply = response["reply"]
-            summary["action_status"] = reply["data"]
-            summary["raw"] = response
-        except Exception:
-            self.debug_print(ERR_PARSING_RESPONSE)
+            if not (wait and pending):
+                break
+            wake_up = min(next_poll[action_id] for action_id in pending)
+            if wake_up >= deadline:
+                self.save_progress(f"Reached the wait timeout of {wait_timeout} seconds with {len(pending)} action(s) pending")
+                break
+            self.send_progress(f"Waiting for {len(pending)} action(s) to complete")
+            time.sleep(max(0, wake_up - time.monotonic()))
+
+        if responses:
+            self._log_payload("Response JSON", list(responses.values()))
+
+        if not (cached or responses):
+            return action_result.set_status(
+                phantom.APP_ERROR, f"Unable to get the action status. {self._get_failures_message('Action', failed_actions)}"
+            )
+
+        # Add the response of every action into the data section, in the requested order
+        action_statuses = {}
+        for action_id in validated_ids:
+            if action_id in cached:
+                response = {"reply": {"data": cached[action_id]}}
+            elif action_id in responses:
+                response = responses[action_id]
+            else:
+                continue
+            statuses = response["reply"]["data"]
+            action_result.add_data({"action_id": action_id, "cached": action_id in cached, "terminal": is_terminal(statuses), **response})
+            action_statuses[str(action_id)] = statuses
+
+        # Add a dictionary that is made up of the most important values from data into the summary
+        summary = action_result.update_summary({})
+        summary["action_status"] = next(iter(action_statuses.values()))
+        if responses:
+            self._add_legacy_summary(summary, next(iter(responses.values())))
+        if len(validated_ids) > 1:
+            summary["action_statuses"] = action_statuses
+        summary["actions_terminal"] = sum(is_terminal(statuses) for statuses in action_statuses.values())
+        summary["actions_pending"] = len(action_statuses) - summary["actions_terminal"]
+        summary["actions_failed"] = len(failed_actions)
+        summary["cache_hits"] = len(cached)
+        summary["status_polls"] = poll_count
+        if failed_actions:
+            summary["failed_actions"] = {str(action_id): message for action_id, message in failed_actions.items()}
 
         # Return success, no need to set the message, only the status
         # BaseConnector will create a textual message based off of the summary dictionary
@@ -476,7 +2305,7 @@ class TestConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Please provide at least one file path")
         request_data["files"] = files
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -488,14 +2317,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -520,7 +2349,7 @@ class TestConnector(BaseConnector):
         request_data, parameters = {}, {}
         request_data["group_action_id"] = action_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -532,14 +2361,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["file_url"] = reply["data"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -570,7 +2399,7 @@ class TestConnector(BaseConnector):
         request_data["file_path"] = file_path
         request_data["file_hash"] = file_hash
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -582,14 +2411,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -612,7 +2441,7 @@ class TestConnector(BaseConnector):
         request_data["file_hash"] = file_hash
         request_data["endpoint_id"] = endpoint_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -624,14 +2453,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -663,7 +2492,7 @@ class TestConnector(BaseConnector):
             request_data["incident_id"] = str(incident_id)
 
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -675,13 +2504,13 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             summary["list_updated"] = response["reply"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -713,7 +2542,7 @@ class TestConnector(BaseConnector):
             request_data["incident_id"] = str(incident_id)
 
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -725,13 +2554,13 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             summary["list_updated"] = response["reply"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -752,7 +2581,7 @@ class TestConnector(BaseConnector):
         request_data, parameters = {}, {}
         request_data["endpoint_id"] = endpoint_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -764,14 +2593,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -792,7 +2621,7 @@ class TestConnector(BaseConnector):
         request_data, parameters = {}, {}
         request_data["endpoint_id"] = endpoint_id
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -804,14 +2633,14 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
             summary = action_result.update_summary({})
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -957,7 +2786,7 @@ class TestConnector(BaseConnector):
             request_data["filters"] = filters
 
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -969,7 +2798,7 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
@@ -977,7 +2806,7 @@ class TestConnector(BaseConnector):
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
             summary["endpoint_scanning"] = reply["endpoints_count"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -1123,7 +2952,7 @@ class TestConnector(BaseConnector):
             request_data["filters"] = filters
 
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", parameters)
 
         # make rest call
         headers = self.authenticationHeaders()
@@ -1135,7 +2964,7 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
@@ -1143,7 +2972,7 @@ class TestConnector(BaseConnector):
             reply = response["reply"]
             summary["action_id"] = reply["action_id"]
             summary["endpoint_cancelling"] = reply["endpoints_count"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response)
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -1172,6 +3001,12 @@ class TestConnector(BaseConnector):
         sort = param.get("sort", False)
         sort_field = param.get("sort_field", "creation_time")
         sort_order = param.get("sort_order", "desc")
+        max_results = param.get("max_results")
+        page_size = param.get("page_size", DEFAULT_PAGE_SIZE)
+
+        ret_val, projection = self._get_projection(action_result, param.get("fields"))
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
 
         request_data, parameters = {}, {}
         filters = []
@@ -1253,6 +3088,21 @@ class TestConnector(BaseConnector):
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
             request_data["search_to"] = search_to
+        if max_results:
+            # Validate 'max_results' and 'page_size' action parameters
+            ret_val, max_results = self._validate_integer(action_result, max_results, MAXRESULTS_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            ret_val, page_size = self._validate_integer(action_result, page_size, PAGESIZE_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                return action_result.set_status(phantom.APP_ERROR, RANGE_INTEGER_MSG.format(min=1, max=MAX_PAGE_SIZE, key=PAGESIZE_ACTION_PARAM))
+            if search_to:
+                # The result set ends at 'search_to' when it is provided
+                if search_to <= (search_from or 0):
+                    return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=SEARCHTO_ACTION_PARAM))
+                max_results = min(max_results, search_to - (search_from or 0))
         if sort:
             fields = ["modification_time", "creation_time"]
             if any(value == sort_field for value in fields):
@@ -1266,11 +3116,20 @@ class TestConnector(BaseConnector):
             else:
                 return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=SORTFIELD_ACTION_PARAM))
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
-
-        # make rest call
-        headers = self.authenticationHeaders()
-        ret_val, response = self._make_rest_call("/incidents/get_incidents/", action_result, headers=headers, json=parameters)
+        self._log_payload("Request JSON", parameters)
+
+        if max_results:
+            # Fetch every page of the result set up to 'max_results' incidents
+            ret_val, response = self._fetch_pages(
+                action_result, "/incidents/get_incidents/", "incidents", request_data, max_results, page_size, projection
+            )
+        elif projection:
+            # The incidents are pruned to the requested fields as they are decoded
+            ret_val, response = self._get_projected_response(action_result, "/incidents/get_incidents/", "incidents", request_data, projection)
+        else:
+            # make rest call
+            headers = self.authenticationHeaders()
+            ret_val, response = self._make_rest_call("/incidents/get_incidents/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
             # the call to the 3rd party device or service failed, action result should contain all the error details
@@ -1278,7 +3137,7 @@ class TestConnector(BaseConnector):
 
         # Add the response into the data section
         action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
@@ -1286,10 +3145,7 @@ class TestConnector(BaseConnector):
             reply = response["reply"]
             summary["total_count"] = reply["total_count"]
             summary["result_count"] = reply["result_count"]
-            incidents = reply["incidents"]
-            for x in range(len(incidents)):
-                summary[f"result_{x + 1}"] = incidents[x]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response, reply["incidents"], "result_{}")
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
@@ -1305,52 +3161,97 @@ class TestConnector(BaseConnector):
         action_result = self.add_action_result(ActionResult(dict(param)))
 
         # Access action parameters passed in the 'param' dictionary
-        incident_id = param["incident_id"]
+        incident_ids = [x.strip() for x in str(param["incident_id"]).split(",") if x.strip()]
         alerts_limit = param.get("alerts_limit")
 
-        request_data, parameters = {}, {}
-        # Validate 'incident_id' action parameter
-        ret_val, incident_id = self._validate_integer(action_result, incident_id, INCIDENTID_ACTION_PARAM)
-        if phantom.is_fail(ret_val):
-            return action_result.get_status()
-        request_data["incident_id"] = str(incident_id)
+        if not incident_ids:
+            return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=INCIDENTID_ACTION_PARAM))
+        validated_ids = []
+        for incident_id in incident_ids:
+            # Validate 'incident_id' action parameter
+            ret_val, incident_id = self._validate_integer(action_result, incident_id, INCIDENTID_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            if incident_id not in validated_ids:
+                validated_ids.append(incident_id)
         if alerts_limit:
             # Validate 'alerts_limit' action parameter
             ret_val, alerts_limit = self._validate_integer(action_result, alerts_limit, ALERTSLIMIT_ACTION_PARAM)
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
-            request_data["alerts_limit"] = alerts_limit
-        parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
+        self._log_payload("Request JSON", {"incident_ids": validated_ids, "alerts_limit": alerts_limit})
 
-        # make rest call
-        headers = self.authenticationHeaders()
-        ret_val, response = self._make_rest_call("/incidents/get_incident_extra_data/", action_result, headers=headers, json=parameters)
+        def fetch(worker_result, incident_id):
+            return self._get_incident_extra_data(worker_result, incident_id, alerts_limit)
 
-        if phantom.is_fail(ret_val):
-            # the call to the 3rd party device or service failed, action result should contain all the error details
-            return action_result.get_status()
+        replies, failed_incidents = self._run_workers(action_result, fetch, validated_ids, INCIDENT_DETAILS_WORKERS, "Incident")
+        responses = list(replies.values())
+        for response in responses:
+            # Add the response of every incident into the data section
+            action_result.add_data(response)
 
-        # Add the response into the data section
-        action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        if not responses:
+            return action_result.set_status(
+                phantom.APP_ERROR, f"Unable to get the incident details. {self._get_failures_message('Incident', failed_incidents)}"
+            )
+
+        self._log_payload("Response JSON", responses)
 
+        # Add a dictionary that is made up of the most important values from data into the summary
+        summary = action_result.update_summary({})
         try:
-            # Add a dictionary that is made up of the most important values from data into the summary
-            summary = action_result.update_summary({})
-            reply = response["reply"]["file_artifacts"]["data"][0]
+            reply = responses[0]["reply"]["file_artifacts"]["data"][0]
             summary["alert_count"] = reply["alert_count"]
             summary["is_malicious"] = reply["is_malicious"]
             summary["file_name"] = reply["file_name"]
             summary["file_sha256"] = reply["file_sha256"]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, responses[0])
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
+        total_alert_count, malicious_files = 0, []
+        for response in responses:
+            reply = response.get("reply") or {}
+            total_alert_count += (reply.get("incident") or {}).get("alert_count") or 0
+            for file_artifact in (reply.get("file_artifacts") or {}).get("data") or []:
+                if file_artifact.get("is_malicious") and file_artifact.get("file_sha256") not in malicious_files:
+                    malicious_files.append(file_artifact.get("file_sha256"))
+        summary["incidents_fetched"] = len(responses)
+        summary["incidents_failed"] = len(failed_incidents)
+        summary["total_alert_count"] = total_alert_count
+        summary["malicious_file_count"] = len(malicious_files)
+        summary["malicious_files"] = malicious_files
+        if failed_incidents:
+            summary["failed_incidents"] = {str(incident_id): message for incident_id, message in failed_incidents.items()}
+
         # Return success, no need to set the message, only the status
         # BaseConnector will create a textual message based off of the summary dictionary
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _advance_alert_cursor(self, cursor_key, cursor, alerts):
+        """This method drops the alerts already returned at the boundary timestamp of a "since last run" cursor and advances it.
+
+        The cursor holds the latest creation_time returned for a filter set, the field the query filters and sorts
+        on, and the IDs of the alerts returned at that time, the next run queries from that time on and skips those alerts.
+        :param cursor_key: key of the filter set, the cursor is stored as 'alert_cursor_<key>'
+        :param cursor: current cursor
+        :param alerts: list of alerts fetched from the cursor timestamp on, in ascending creation order
+        :return: list of the alerts not returned by a previous run
+        """
+        boundary = cursor["timestamp"]
+        seen_ids = cursor["alert_ids"]
+        new_alerts = [alert for alert in alerts if not (alert.get("creation_time") == boundary and alert.get("alert_id") in seen_ids)]
+
+        timestamps = [alert["creation_time"] for alert in new_alerts if alert.get("creation_time") is not None]
+        if timestamps:
+            latest = max(timestamps)
+            alert_ids = [alert.get("alert_id") for alert in new_alerts if alert.get("creation_time") == latest]
+            if latest == boundary:
+                alert_ids = seen_ids + alert_ids
+            self._checkpoint({f"alert_cursor_{cursor_key}": {"timestamp": latest, "alert_ids": alert_ids}})
+
+        return new_alerts
+
     def _handle_get_alerts(self, param):
         # use self.save_progress(...) to send progress messages back to the platform
         self.save_progress(f"In action handler for: {self.get_action_identifier()}")
@@ -1368,6 +3269,16 @@ class TestConnector(BaseConnector):
         sort = param.get("sort", False)
         sort_field = param.get("sort_field", "creation_time")
         sort_order = param.get("sort_order", "desc")
+        max_results = param.get("max_results")
+        page_size = param.get("page_size", DEFAULT_PAGE_SIZE)
+        time_budget = param.get("time_budget")
+        since_last_run = param.get("since_last_run", False)
+
+        # The since last run cursor is built from the alert IDs and creation times
+        required_fields = ("alert_id", "creation_time") if since_last_run else ()
+        ret_val, projection = self._get_projection(action_result, param.get("fields"), required_fields)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
 
         request_data, parameters = {}, {}
         filters = []
@@ -1427,6 +3338,24 @@ class TestConnector(BaseConnector):
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
             request_data["search_to"] = search_to
+        if max_results or since_last_run:
+            # Validate 'max_results', 'page_size' and 'time_budget' action parameters
+            ret_val, max_results = self._validate_integer(action_result, max_results, MAXRESULTS_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            ret_val, page_size = self._validate_integer(action_result, page_size, PAGESIZE_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                return action_result.set_status(phantom.APP_ERROR, RANGE_INTEGER_MSG.format(min=1, max=MAX_PAGE_SIZE, key=PAGESIZE_ACTION_PARAM))
+            ret_val, time_budget = self._validate_integer(action_result, time_budget, TIMEBUDGET_ACTION_PARAM)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            if search_to and not since_last_run:
+                # The result set ends at 'search_to' when it is provided
+                if search_to <= (search_from or 0):
+                    return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=SEARCHTO_ACTION_PARAM))
+                max_results = min(max_results, search_to - (search_from or 0))
         if sort:
             fields = ["severity", "creation_time"]
             if any(value == sort_field for value in fields):
@@ -1439,20 +3368,67 @@ class TestConnector(BaseConnector):
                     return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=SORTORDER_ACTION_PARAM))
             else:
                 return action_result.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=SORTFIELD_ACTION_PARAM))
+        cursor_key = cursor = None
+        if since_last_run:
+            # The cursor of the filter set replaces the 'creation_time' filter, the offsets and the sort order
+            cursor_filters = [f for f in filters if f["field"] != "creation_time"]
+            cursor_key = hashlib.sha256(json.dumps(cursor_filters, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+            cursor = self._store.get_cursor(f"alert_cursor_{cursor_key}")
+            if not cursor:
+                # The first run starts at the given creation time or now instead of replaying the whole alert history,
+                # the cursor is recorded right away so that the alerts created until the next run are not missed
+                cursor = {"timestamp": creation_time or int(time.time() * 1000), "alert_ids": []}
+                self._checkpoint({f"alert_cursor_{cursor_key}": cursor})
+            request_data["filters"] = [*cursor_filters, {"field": "creation_time", "operator": "gte", "value": cursor["timestamp"]}]
+            request_data.pop("search_from", None)
+            request_data.pop("search_to", None)
+            request_data["sort"] = {"field": "creation_time", "keyword": "asc"}
+            search_from = None
+            max_results = max_results or page_size
         parameters["request_data"] = request_data
-        self.save_progress(f"Request JSON: {parameters}")
-
-        # make rest call
-        headers = self.authenticationHeaders()
-        ret_val, response = self._make_rest_call("/alerts/get_alerts_multi_events/", action_result, headers=headers, json=parameters)
+        self._log_payload("Request JSON", parameters)
+
+        latencies = None
+        if max_results:
+            # Walk the pages of the result set, the alerts are added to the data section as they are decoded
+            response = {}
+            action_result.add_data(response)
+            ret_val, latencies = self._stream_pages(
+                action_result,
+                "/alerts/get_alerts_multi_events/",
+                "alerts",
+                request_data,
+                response,
+                max_results,
+                page_size,
+                time_budget,
+                projection,
+            )
+        elif projection:
+            # The alerts are pruned to the requested fields as they are decoded
+            ret_val, response = self._get_projected_response(
+                action_result, "/alerts/get_alerts_multi_events/", "alerts", request_data, projection
+            )
+        else:
+            # make rest call
+            headers = self.authenticationHeaders()
+            ret_val, response = self._make_rest_call("/alerts/get_alerts_multi_events/", action_result, headers=headers, json=parameters)
 
         if phantom.is_fail(ret_val):
             # the call to the 3rd party device or service failed, action result should contain all the error details
             return action_result.get_status()
 
-        # Add the response into the data section
-        action_result.add_data(response)
-        self.save_progress(f"Response JSON: {response}")
+        if latencies is None:
+            # Add the response into the data section
+            action_result.add_data(response)
+        duplicate_count = 0
+        if since_last_run:
+            reply = response["reply"]
+            alerts = self._advance_alert_cursor(cursor_key, cursor, reply["alerts"])
+            duplicate_count = len(reply["alerts"]) - len(alerts)
+            reply["alerts"] = alerts
+            reply["result_count"] = len(alerts)
+        self._log_payload("Response JSON", response)
 
         try:
             # Add a dictionary that is made up of the most important values from data into the summary
@@ -1468,12 +3444,21 @@ class TestConnector(BaseConnector):
             summary["endpoint_id"] = alerts[0]["endpoint_id"]
             summary["host_name"] = alerts[0]["host_name"]
             summary["ip_address"] = alerts[0]["host_ip"]
-            for x in range(len(alerts)):
-                summary[f"Result {x + 1}"] = alerts[x]
-            summary["raw"] = response
+            self._add_legacy_summary(summary, response, alerts, "Result {}")
         except Exception:
             self.debug_print(ERR_PARSING_RESPONSE)
 
+        if latencies is not None:
+            summary = action_result.update_summary({})
+            summary["pages_fetched"] = len(latencies)
+            summary["page_latency_ms"] = latencies
+            reply = response["reply"]
+            summary["results_remaining"] = max(
+                reply.get("total_count", 0) - (search_from or 0) - reply.get("result_count", 0) - duplicate_count, 0
+            )
+            if since_last_run:
+                summary["duplicates_skipped"] = duplicate_count
+
         # Return success, no need to set the message, only the status
         # BaseConnector will create a textual message based off of the summary dictionary
         return action_result.set_status(phantom.APP_SUCCESS)
@@ -1495,6 +3480,9 @@ class TestConnector(BaseConnector):
         elif action_id == "list_endpoints":
             ret_val = self._handle_list_endpoints(param)
 
+        elif action_id == "find_endpoint":
+            ret_val = self._handle_find_endpoint(param)
+
         elif action_id == "get_policy":
             ret_val = self._handle_get_policy(param)
 
@@ -1547,6 +3535,13 @@ class TestConnector(BaseConnector):
         # that needs to be accessed across actions
         self._state = self.load_state()
 
+        # The cursors, indexes and caches are kept in the state store
+        try:
+            self._store = StateStore(os.path.join(self.get_state_dir(), f"{self.get_asset_id()}_state.db"))
+            self._migrate_state()
+        except Exception as e:
+            return self.set_status(phantom.APP_ERROR, f"Unable to open the state store. {self._get_error_message_from_exception(e)}")
+
         # get the asset config
         config = self.get_config()
 
@@ -1556,11 +3551,57 @@ class TestConnector(BaseConnector):
         self._api_key_id = config["api_id"]
         self._verify = config.get("verify_server_cert", False)
 
+        # Validate 'http_pool_size' asset configuration parameter
+        ret_val, pool_size = self._validate_integer(self, config.get("http_pool_size", DEFAULT_HTTP_POOL_SIZE), HTTPPOOLSIZE_CONFIG_PARAM)
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+        if not pool_size:
+            return self.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=HTTPPOOLSIZE_CONFIG_PARAM))
+
+        # Validate 'max_retries' asset configuration parameter
+        ret_val, self._max_retries = self._validate_integer(self, config.get("max_retries", DEFAULT_MAX_RETRIES), MAXRETRIES_CONFIG_PARAM)
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        # Validate 'rate_limit_rps' and 'rate_limit_burst' asset configuration parameters
+        ret_val, rate = self._validate_integer(self, config.get("rate_limit_rps", 0), RATELIMITRPS_CONFIG_PARAM)
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+        ret_val, burst = self._validate_integer(self, config.get("rate_limit_burst", DEFAULT_RATE_LIMIT_BURST), RATELIMITBURST_CONFIG_PARAM)
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+        if rate:
+            if not burst:
+                return self.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=RATELIMITBURST_CONFIG_PARAM))
+            bucket_key = hashlib.sha256(f"{config['fqdn']}:{self._api_key_id}".encode()).hexdigest()[:32]
+            self._rate_limit = (rate, burst, os.path.join(self.get_state_dir(), f"rate_limit_{bucket_key}.json"))
+
+        # Validate 'log_verbosity' and 'log_max_bytes' asset configuration parameters
+        self._log_verbosity = config.get("log_verbosity", DEFAULT_LOG_VERBOSITY)
+        if self._log_verbosity not in LOG_VERBOSITY_LEVELS:
+            return self.set_status(phantom.APP_ERROR, VALID_VALUE_MSG.format(key=LOGVERBOSITY_CONFIG_PARAM))
+        ret_val, self._log_max_bytes = self._validate_integer(self, config.get("log_max_bytes", DEFAULT_LOG_MAX_BYTES), LOGMAXBYTES_CONFIG_PARAM)
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        self._legacy_summaries = config.get("legacy_summaries", False)
+
+        # A single keep-alive session is shared by every call of the action, including the worker threads
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
         return phantom.APP_SUCCESS
 
     def finalize(self):
         # Save the state, this data is saved across actions and app upgrades
         self.save_state(self._state)
+        if self._store:
+            self._store.evict(STATE_STORE_EVICTION_INTERVAL)
+            self._store.close()
+        if self._session:
+            self._session.close()
         return phantom.APP_SUCCESS
 
 
@@ -23,6 +23,8 @@ VALID_VALUE_MSG = "Please provide a valid value in the {key}"
 # Integer validation constants
 VALID_INTEGER_MSG = "Please provide a valid integer value in the {key}"
 NON_NEGATIVE_INTEGER_MSG = "Please provide a valid non-negative integer value in the {key}"
+RANGE_INTEGER_MSG = "Please provide a value between {min} and {max} in the {key}"
+INVALID_TIME_RANGE_MSG = "The 'start_time' action parameter must not be later than the 'end_time' action parameter"
 
 # Parameter Keys
 ACTIONID_ACTION_PARAM = "'action_id' action parameter"
@@ -35,6 +37,28 @@ SEARCHFROM_ACTION_PARAM = "'search_from' action parameter"
 SEARCHTO_ACTION_PARAM = "'search_to' action parameter"
 ALERTSLIMIT_ACTION_PARAM = "'alerts_limit' action parameter"
 ALERTID_ACTION_PARAM = "'alert_id' action parameter"
+CONTAINERCOUNT_ACTION_PARAM = "'container_count' action parameter"
+STARTTIME_ACTION_PARAM = "'start_time' action parameter"
+ENDTIME_ACTION_PARAM = "'end_time' action parameter"
+MAXRESULTS_ACTION_PARAM = "'max_results' action parameter"
+PAGESIZE_ACTION_PARAM = "'page_size' action parameter"
+TIMEBUDGET_ACTION_PARAM = "'time_budget' action parameter"
+FIELDS_ACTION_PARAM = "'fields' action parameter"
+ENDPOINTID_ACTION_PARAM = "'endpoint_id' action parameter"
+WAITTIMEOUT_ACTION_PARAM = "'wait_timeout' action parameter"
+VALUE_ACTION_PARAM = "'value' action parameter"
+POLLPAGESIZE_CONFIG_PARAM = "'poll_page_size' asset configuration parameter"
+INGESTBATCHSIZE_CONFIG_PARAM = "'ingest_batch_size' asset configuration parameter"
+ENRICHMENTWORKERS_CONFIG_PARAM = "'enrichment_workers' asset configuration parameter"
+BACKFILLWORKERS_CONFIG_PARAM = "'backfill_workers' asset configuration parameter"
+HTTPPOOLSIZE_CONFIG_PARAM = "'http_pool_size' asset configuration parameter"
+MAXRETRIES_CONFIG_PARAM = "'max_retries' asset configuration parameter"
+RATELIMITRPS_CONFIG_PARAM = "'rate_limit_rps' asset configuration parameter"
+RATELIMITBURST_CONFIG_PARAM = "'rate_limit_burst' asset configuration parameter"
+LOGVERBOSITY_CONFIG_PARAM = "'log_verbosity' asset configuration parameter"
+LOGMAXBYTES_CONFIG_PARAM = "'log_max_bytes' asset configuration parameter"
+INVENTORYREFRESHHOURS_CONFIG_PARAM = "'inventory_refresh_hours' asset configuration parameter"
+POLICYCACHETTL_CONFIG_PARAM = "'policy_cache_ttl' asset configuration parameter"
 
 SORTORDER_ACTION_PARAM = "'sort_order' action parameter"
 SORTFIELD_ACTION_PARAM = "'sort_field' action parameter"
@@ -47,3 +71,122 @@ SEVERITY_ACTION_PARAM = "'severity' action parameter"
 PLATFORMS_LIST = ["windows", "linux", "macos", "android"]
 SCAN_STATUSES = ["none", "pending", "in_progress", "canceled", "aborted", "pending_cancellation", "success", "error"]
 SORT_ORDERS = ["asc", "desc"]
+LOG_VERBOSITY_LEVELS = ["minimal", "normal", "verbose"]
+
+# Logging constants, request and response payloads are truncated to the byte cap in the logs
+DEFAULT_LOG_VERBOSITY = "normal"
+DEFAULT_LOG_MAX_BYTES = 4096
+
+# HTTP session constants
+DEFAULT_HTTP_POOL_SIZE = 20
+STREAM_CHUNK_SIZE = 65536
+
+# Paging constants, the pages following the first one are fetched concurrently
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+PAGE_FETCH_WORKERS = 5
+
+# Incident details constants
+INCIDENT_DETAILS_WORKERS = 5
+
+# Get policy constants, the policy names are cached per endpoint for the configured number of seconds
+DEFAULT_POLICY_CACHE_TTL = 3600
+POLICY_FETCH_WORKERS = 5
+
+# Get action status constants, a group action is terminal once every endpoint reached one of the terminal
+# statuses, the statuses of terminal actions are cached forever. While waiting, the interval between two
+# polls of an action grows by the backoff factor as long as its status does not change
+ACTION_TERMINAL_STATUSES = ["COMPLETED_SUCCESSFULLY", "COMPLETED_PARTIAL", "FAILED", "CANCELED", "ABORTED", "EXPIRED", "TIMEOUT"]
+ACTION_STATUS_WORKERS = 5
+DEFAULT_ACTION_WAIT_TIMEOUT = 300
+ACTION_POLL_MIN_INTERVAL = 2
+ACTION_POLL_MAX_INTERVAL = 30
+ACTION_POLL_BACKOFF = 1.5
+
+# Endpoint inventory constants, a full walk of the endpoints replaces the inventory once per refresh interval
+# and the refreshes in between only fetch the endpoints first seen since the previous one
+DEFAULT_INVENTORY_REFRESH_HOURS = 24
+INVENTORY_PAGE_SIZE = 100
+INVENTORY_OVERLAP_MS = 5 * 60 * 1000
+ENDPOINT_KEY_FIELDS = ["endpoint_id", "endpoint_name", "ip", "ipv6", "public_ip", "alias"]
+
+# Endpoint delta constants, the volatile fields change on every check-in and are left out of the content hashes
+ENDPOINT_VOLATILE_FIELDS = ["last_seen", "last_content_update_time"]
+
+# Retry constants, the mutating endpoints are only retried when no connection to the server could be established
+DEFAULT_MAX_RETRIES = 3
+RETRY_BACKOFF_BASE = 1
+MAX_RETRY_DELAY = 60
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+MUTATING_ENDPOINTS = [
+    "/endpoints/isolate/",
+    "/endpoints/unisolate/",
+    "/endpoints/scan/",
+    "/endpoints/abort_scan/",
+    "/endpoints/file_retrieval/",
+    "/endpoints/quarantine/",
+    "/endpoints/restore/",
+    "/hash_exceptions/blocklist/",
+    "/hash_exceptions/allowlist/",
+]
+
+# Rate limit constants, the reserve is the share of the burst only on_poll may use
+DEFAULT_RATE_LIMIT_BURST = 10
+RATE_LIMIT_POLL_RESERVE = 0.2
+
+# On poll constants
+DEFAULT_POLL_PAGE_SIZE = 100
+MAX_POLL_PAGE_SIZE = 100
+FIRST_RUN_LOOKBACK_DAYS = 7
+DEFAULT_INGEST_BATCH_SIZE = 100
+MAX_INCIDENT_INDEX_SIZE = 50000
+SYNC_OVERLAP_MS = 60000
+DEFAULT_ENRICHMENT_WORKERS = 5
+MAX_WORKERS = 20
+DEFAULT_BACKFILL_WORKERS = 1
+BACKFILL_THRESHOLD_MS = 24 * 60 * 60 * 1000
+BACKFILL_SHARD_MS = 6 * 60 * 60 * 1000
+BACKFILL_PREFETCH_PAGES = 2
+ALERT_DEFER_MAX_MS = 24 * 60 * 60 * 1000
+MAX_CONTAINER_ATTEMPTS = 3
+
+# State store constants, the ingested IDs are kept for the retention period counted from the item creation time
+# and the eviction runs at most once per eviction interval
+STATE_STORE_VERSION = 1
+STATE_STORE_TIMEOUT = 30
+STATE_STORE_BATCH_SIZE = 500
+INGESTED_IDS_RETENTION_DAYS = 30
+STATE_STORE_EVICTION_INTERVAL = 15 * 60
+MAX_PERMANENT_CACHE_ENTRIES = 10000
+
+# CEF schemas, every field maps to its (CEF field, CEF contains). Nested objects are addressed
+# by their underscore joined path, fields missing from the schema keep their own name when
+# the schema is used in passthrough mode and are dropped otherwise
+INCIDENT_CEF_SCHEMA = {
+    "incident_id": ("incident_id", ["cortex incident id"]),
+    "assigned_user_mail": ("assigned_user_mail", ["email"]),
+    "xdr_url": ("xdr_url", ["url"]),
+}
+ALERT_CEF_SCHEMA = {
+    "alert_id": ("alert_id", ["cortex alert id"]),
+    "endpoint_id": ("endpoint_id", ["cortex endpoint id"]),
+    "host_ip": ("host_ip", ["ip"]),
+    "host_name": ("host_name", ["host name"]),
+    "action_file_sha256": ("action_file_sha256", ["sha256", "hash"]),
+    "actor_process_image_sha256": ("actor_process_image_sha256", ["sha256", "hash"]),
+}
+FILE_ARTIFACT_CEF_SCHEMA = {
+    "file_name": ("fileName", ["file name"]),
+    "file_sha256": ("fileHash", ["sha256", "hash"]),
+    "file_signature_vendor_name": ("fileSignatureVendor", []),
+    "file_wildfire_verdict": ("fileWildfireVerdict", []),
+    "is_malicious": ("isMalicious", []),
+    "alert_count": ("alertCount", []),
+}
+NETWORK_ARTIFACT_CEF_SCHEMA = {
+    "network_remote_ip": ("destinationAddress", ["ip"]),
+    "network_remote_port": ("destinationPort", ["port"]),
+    "network_domain": ("destinationDnsDomain", ["domain"]),
+    "network_country": ("destinationCountry", []),
+    "alert_count": ("alertCount", []),
+}